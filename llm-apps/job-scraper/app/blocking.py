@@ -0,0 +1,86 @@
+from typing import Iterable
+from urllib.parse import urlparse
+
+from decouple import Csv, config
+
+
+# We only ever keep page.content(), so nothing that is painted needs to load.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet"})
+
+BLOCKED_DOMAINS = config(
+    "JOB_SCRAPER_BLOCKED_DOMAINS",
+    default=(
+        "google-analytics.com,googletagmanager.com,doubleclick.net,googlesyndication.com,"
+        "facebook.net,connect.facebook.net,hotjar.com,segment.io,segment.com,"
+        "mixpanel.com,amplitude.com,fullstory.com,intercom.io,hs-analytics.net,"
+        "ads-twitter.com,clarity.ms,newrelic.com,nr-data.net,optimizely.com"
+    ),
+    cast=Csv(),
+)
+ALLOWED_DOMAINS = config("JOB_SCRAPER_ALLOWED_DOMAINS", default="", cast=Csv())
+
+
+def _matches_domain(host: str, domains: Iterable[str]) -> bool:
+    return any(host == domain or host.endswith(f".{domain}") for domain in domains)
+
+
+def should_block(
+    resource_type: str,
+    url: str,
+    allowed_domains: Iterable[str] = ALLOWED_DOMAINS,
+    blocked_domains: Iterable[str] = BLOCKED_DOMAINS,
+) -> bool:
+    """
+    Decide whether a browser request is worth making for an HTML-only scrape.
+
+    Images, fonts, media and stylesheets are always dropped. Any other request
+    is dropped when its host is on the deny list, unless it is also on the
+    allow list.
+    """
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlparse(url).hostname or ""
+    if _matches_domain(host, allowed_domains):
+        return False
+    return _matches_domain(host, blocked_domains)
+
+
+def _is_page_navigation(request) -> bool:
+    # The page we were asked to scrape always loads, whatever its domain.
+    return request.is_navigation_request() and request.frame.parent_frame is None
+
+
+async def block_unneeded_requests(
+    page,
+    allowed_domains: Iterable[str] = ALLOWED_DOMAINS,
+    blocked_domains: Iterable[str] = BLOCKED_DOMAINS,
+) -> None:
+    async def handle(route):
+        request = route.request
+        blocked = not _is_page_navigation(request) and should_block(
+            request.resource_type, request.url, allowed_domains, blocked_domains
+        )
+        if blocked:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await page.route("**/*", handle)
+
+
+def block_unneeded_requests_sync(
+    page,
+    allowed_domains: Iterable[str] = ALLOWED_DOMAINS,
+    blocked_domains: Iterable[str] = BLOCKED_DOMAINS,
+) -> None:
+    def handle(route):
+        request = route.request
+        blocked = not _is_page_navigation(request) and should_block(
+            request.resource_type, request.url, allowed_domains, blocked_domains
+        )
+        if blocked:
+            route.abort()
+        else:
+            route.continue_()
+
+    page.route("**/*", handle)
@@ -0,0 +1,140 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from decouple import config
+
+
+class ExtractionCache:
+    """
+    A persistent SQLite cache of LLM extraction results.
+
+    Keys are content hashes of the model id, the prompt and the normalized
+    prompt inputs, so an unchanged page maps to the same entry on every
+    scrape. Entries expire after ttl seconds and the least recently used ones
+    are evicted once the cache holds more than max_entries.
+    """
+
+    def __init__(self, path: str, ttl: float, max_entries: int, enabled: bool = True):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def make_key(model_id: str, prompt: str, **inputs: str) -> str:
+        normalized = {name: " ".join(str(value).split()) for name, value in inputs.items()}
+        payload = json.dumps(
+            {"model_id": model_id, "prompt": prompt, "inputs": normalized}, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    conn.commit()
+                self._misses += 1
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self._hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ? OR key IN ("
+                "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (now - self.ttl, self.max_entries),
+            )
+            conn.commit()
+
+    def _lookup(self, model_id: str, prompt: str, **inputs: str) -> Tuple[str, Optional[str]]:
+        key = self.make_key(model_id, prompt, **inputs)
+        return key, self.get(key)
+
+    async def lookup(self, model_id: str, prompt: str, **inputs: str) -> Tuple[str, Optional[str]]:
+        """
+        The key for these inputs and the cached value under it, if any.
+
+        Hashing a whole page and the SQLite read (which commits the LRU touch)
+        run in a worker thread, so they never stall other scrapes on the
+        event loop.
+        """
+        return await asyncio.to_thread(self._lookup, model_id, prompt, **inputs)
+
+    async def aset(self, key: str, value: str) -> None:
+        """set() in a worker thread."""
+        if self.enabled:
+            await asyncio.to_thread(self.set, key, value)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        entries = 0
+        if self.enabled:
+            with self._lock:
+                entries = self._connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {
+            "enabled": self.enabled,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+
+extraction_cache = ExtractionCache(
+    path=config("JOB_SCRAPER_CACHE_PATH", default="job_scraper_cache.db"),
+    ttl=config("JOB_SCRAPER_CACHE_TTL", default=7 * 24 * 60 * 60, cast=float),
+    max_entries=config("JOB_SCRAPER_CACHE_MAX_ENTRIES", default=10000, cast=int),
+    enabled=config("JOB_SCRAPER_CACHE_ENABLED", default=True, cast=bool),
+)
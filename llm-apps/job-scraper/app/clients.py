@@ -0,0 +1,39 @@
+import functools
+import threading
+from typing import Callable, TypeVar
+
+import boto3
+from botocore.config import Config
+from decouple import config
+
+
+T = TypeVar("T")
+
+BEDROCK_MAX_CONNECTIONS = config("BEDROCK_MAX_CONNECTIONS", default=50, cast=int)
+
+
+def shared_instance(factory: Callable[[], T]) -> Callable[[], T]:
+    """Build factory() on first use and hand the same object to every caller and thread."""
+    lock = threading.Lock()
+    instance = []
+
+    @functools.wraps(factory)
+    def get() -> T:
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    return get
+
+
+@shared_instance
+def get_bedrock_client():
+    return boto3.client(
+        "bedrock-runtime",
+        region_name=config("AWS_REGION_NAME"),
+        aws_access_key_id=config("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=config("AWS_SECRET_ACCESS_KEY"),
+        config=Config(max_pool_connections=BEDROCK_MAX_CONNECTIONS),
+    )
@@ -0,0 +1,59 @@
+import html
+import re
+from typing import List, NamedTuple, Optional, Pattern, Tuple
+from urllib.parse import urldefrag, urljoin
+
+
+HREF_PATTERN = re.compile(r"""<a\s[^>]*?href\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+
+
+class JobUrlRule(NamedTuple):
+    name: str
+    pattern: Pattern[str]
+
+
+JOB_URL_RULES: List[JobUrlRule] = []
+
+
+def register_rule(name: str, pattern: str) -> None:
+    """Add a URL pattern that identifies individual job postings on a known ATS."""
+    JOB_URL_RULES.append(JobUrlRule(name=name, pattern=re.compile(pattern)))
+
+
+register_rule(
+    "greenhouse",
+    r"^https://(?:boards|job-boards)(?:\.eu)?\.greenhouse\.io/[\w.-]+/jobs/\d+/?(?:\?.*)?$",
+)
+register_rule("greenhouse_embed", r"[?&]gh_jid=\d+")
+register_rule(
+    "lever",
+    r"^https://jobs(?:\.eu)?\.lever\.co/[\w.-]+/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}/?$",
+)
+register_rule(
+    "ashby",
+    r"^https://jobs\.ashbyhq\.com/[\w.%-]+/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}/?$",
+)
+
+
+def extract_hrefs(document: str, base_url: str) -> List[str]:
+    hrefs = []
+    for double_quoted, single_quoted in HREF_PATTERN.findall(document):
+        href = html.unescape(double_quoted or single_quoted).strip()
+        if href:
+            hrefs.append(urldefrag(urljoin(base_url, href)).url)
+    return hrefs
+
+
+def match_job_urls(document: str, base_url: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Find job URLs with the first registered rule that matches any link.
+
+    Returns the rule name and the matching URLs in page order, or
+    (None, []) when no rule applies and the LLM has to be asked instead.
+    """
+    hrefs = extract_hrefs(document, base_url)
+    for rule in JOB_URL_RULES:
+        urls = [href for href in hrefs if rule.pattern.search(href)]
+        if urls:
+            return rule.name, list(dict.fromkeys(urls))
+    return None, []
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+from decouple import config
+
+from .scraper1 import scrape_webpage
+from .utils import remove_html_tags
+
+
+logger = logging.getLogger(__name__)
+
+HTTP = "http"
+BROWSER = "browser"
+
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+
+def has_job_content(html: str, min_text_length: int) -> bool:
+    """Whether server-rendered HTML already carries the posting, not a JS shell."""
+    if '"JobPosting"' in html:
+        return True
+    return len(remove_html_tags(html).strip()) >= min_text_length
+
+
+class PageFetcher:
+    """
+    Fetch job detail pages over plain HTTP, escalating to Playwright only when needed.
+
+    Pages on a domain are probed over HTTP until one settles its strategy:
+    job content over HTTP keeps the domain on HTTP, so later pages skip the
+    browser. A page that loads over HTTP without the job content, or
+    max_failures error responses in a row, sends the domain straight to the
+    browser from then on. Network errors and timeouts fall back to the
+    browser for that page only, so a transient failure does not give up the
+    HTTP path for good.
+    """
+
+    def __init__(
+        self, max_connections: int = 50, timeout: float = 15, min_text_length: int = 500, max_failures: int = 3
+    ):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.min_text_length = min_text_length
+        self.max_failures = max_failures
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._strategies: Dict[str, str] = {}
+        self._failures: Dict[str, int] = {}
+        self._counts = {HTTP: 0, BROWSER: 0, "escalations": 0}
+
+    async def start(self) -> None:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": USER_AGENT},
+            )
+
+    async def stop(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _get(self, url: str) -> Tuple[Optional[int], Optional[str]]:
+        """(status, HTML); the HTML only for a 200, and (None, None) on a network error."""
+        if self._session is None:
+            await self.start()
+        try:
+            async with self._session.get(url) as response:
+                if response.status != 200:
+                    return response.status, None
+                return response.status, await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError, UnicodeDecodeError) as e:
+            logger.info("HTTP fetch of %s failed: %s", url, e)
+            return None, None
+
+    async def fetch(self, url: str) -> str:
+        domain = urlparse(url).hostname or ""
+        strategy = self._strategies.get(domain)
+
+        if strategy != BROWSER:
+            status, html = await self._get(url)
+            if html is not None and await asyncio.to_thread(has_job_content, html, self.min_text_length):
+                self._strategies.setdefault(domain, HTTP)
+                self._failures.pop(domain, None)
+                self._counts[HTTP] += 1
+                return html
+            if strategy is None:
+                if html is not None:
+                    # The page loaded but needs JavaScript to show the posting.
+                    self._strategies[domain] = BROWSER
+                elif status is not None:
+                    self._failures[domain] = self._failures.get(domain, 0) + 1
+                    if self._failures[domain] >= self.max_failures:
+                        self._strategies[domain] = BROWSER
+            self._counts["escalations"] += 1
+
+        documents = await scrape_webpage(url=url)
+        self._counts[BROWSER] += 1
+        return documents[0]
+
+    def stats(self) -> dict:
+        return {
+            "fetched_over_http": self._counts[HTTP],
+            "fetched_with_browser": self._counts[BROWSER],
+            "escalations": self._counts["escalations"],
+            "domains": dict(self._strategies),
+        }
+
+
+page_fetcher = PageFetcher(
+    max_connections=config("JOB_SCRAPER_HTTP_MAX_CONNECTIONS", default=50, cast=int),
+    timeout=config("JOB_SCRAPER_HTTP_TIMEOUT", default=15, cast=float),
+    min_text_length=config("JOB_SCRAPER_STATIC_MIN_TEXT_LENGTH", default=500, cast=int),
+    max_failures=config("JOB_SCRAPER_HTTP_MAX_FAILURES", default=3, cast=int),
+)
@@ -1,10 +1,17 @@
-from fastapi import FastAPI, status, Response
+import json
+from typing import Literal
+
+from fastapi import FastAPI, HTTPException, Query, status, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from app.prompts1 import extract_job_information, extract_job_urls
-from app.scraper1 import scrape_webpage
-from app.utils import fix_url, remove_html_tags
+from app.cache import extraction_cache
+from app.fetcher import page_fetcher
+from app.pipeline import discover_listing_job_urls, extract_jobs, get_discovery_stats, get_reduction_stats, job_events
+from app.prompts1 import build_chains, get_batch_stats
+from app.runs import MAX_RESULTS_PAGE_SIZE, run_queue
+from app.scraper1 import browser_pool
 
 app = FastAPI()
 
@@ -16,33 +23,101 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def on_startup():
+    build_chains()
+    await browser_pool.start()
+    await page_fetcher.start()
+    await run_queue.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await run_queue.stop()
+    await page_fetcher.stop()
+    await browser_pool.stop()
+    extraction_cache.close()
+
+
 class URL(BaseModel):
     url: str
 
 
 @app.post("/jobs/", status_code=status.HTTP_201_CREATED)
 async def scrape_job_description(url: URL, response: Response):
-    documents = await scrape_webpage(url=url.url, is_paginated=True)
-
-    total_urls = []
-    for document in documents:
-        results = await extract_job_urls(home_page_html_document=document)
-        for url_object in results:
-            if url_object.urls is None:
-                response.status_code = status.HTTP_400_BAD_REQUEST
-                return {"data": "Error", "status": status.HTTP_400_BAD_REQUEST, "message": "The career page is empty. Nothing to scrape."}
-            total_urls.extend(url_object.urls)
-
-    cleaned_list = []
-    for job_url in total_urls:
-        target_url = job_url if 'https://' in job_url else fix_url(url=job_url)
-        docs = await scrape_webpage(url=target_url)
-        soup = remove_html_tags(docs[0])
-        job_results = await extract_job_information(
-            html_document=soup, apply_url=target_url
-        )
-        for job_info in job_results:
-            if job_info is not None:
-                cleaned_list.append(job_info)
+    _, total_urls = await discover_listing_job_urls(url.url)
+    if total_urls is None:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        return {"data": "Error", "status": status.HTTP_400_BAD_REQUEST, "message": "The career page is empty. Nothing to scrape."}
+
+    cleaned_list = await extract_jobs(total_urls)
 
     return {"data": cleaned_list, "status": status.HTTP_201_CREATED}
+
+
+def _format_event(event: dict, format: str) -> str:
+    if format == "sse":
+        return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+    return json.dumps(event) + "\n"
+
+
+@app.post("/jobs/stream/")
+async def stream_job_description(url: URL, format: Literal["ndjson", "sse"] = "ndjson"):
+    """Same as POST /jobs/, but each job is sent as soon as it is extracted."""
+    async def body():
+        async for event in job_events(url.url):
+            yield _format_event(event, format)
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
+
+
+@app.post("/runs/", status_code=status.HTTP_202_ACCEPTED)
+async def create_run(url: URL):
+    """Queue a scrape in the background and return its run id straight away."""
+    run_id = await run_queue.submit(url.url)
+    return {"run_id": run_id, "status": "queued"}
+
+
+@app.get("/runs/{run_id}")
+async def get_run(run_id: str):
+    run = await run_queue.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run
+
+
+@app.get("/runs/{run_id}/results")
+async def get_run_results(
+    run_id: str, offset: int = Query(default=0, ge=0), limit: int = Query(default=100, ge=1, le=MAX_RESULTS_PAGE_SIZE)
+):
+    run = await run_queue.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return {
+        "data": await run_queue.results(run_id, offset=offset, limit=limit),
+        "status": run["status"],
+        "offset": offset,
+    }
+
+
+@app.post("/runs/{run_id}/cancel")
+async def cancel_run(run_id: str):
+    if await run_queue.get(run_id) is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    if not await run_queue.cancel(run_id):
+        raise HTTPException(status_code=409, detail="Run has already finished")
+    return {"run_id": run_id, "status": "cancelled"}
+
+
+@app.get("/stats/")
+async def stats():
+    return {
+        "browser_pool": browser_pool.stats(),
+        "page_fetcher": page_fetcher.stats(),
+        "llm_cache": extraction_cache.stats(),
+        "listing_reduction": get_reduction_stats(),
+        "url_discovery": get_discovery_stats(),
+        "batch_extraction": get_batch_stats(),
+        "runs": await run_queue.stats(),
+    }
@@ -0,0 +1,150 @@
+import html
+import re
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from decouple import config
+
+
+# Listing pages scraped per careers page, the first one included.
+MAX_LISTING_PAGES = config("JOB_SCRAPER_MAX_LISTING_PAGES", default=20, cast=int)
+# Seconds a listing page may take to load, or a pagination click to navigate.
+PAGE_TIMEOUT = config("JOB_SCRAPER_PAGE_TIMEOUT", default=30, cast=float)
+
+# Query parameters holding a page number, and ones holding a result offset.
+PAGE_PARAMETERS = frozenset({
+    "page", "p", "pg", "paged", "pagenum", "pageno", "page_number", "pagenumber", "pageindex",
+})
+OFFSET_PARAMETERS = frozenset({"offset", "start", "from", "skip"})
+
+PAGE = "page"
+OFFSET = "offset"
+
+_ANCHOR = re.compile(r"<a\b([^>]*)>(.*?)</a\s*>", re.IGNORECASE | re.DOTALL)
+_HREF = re.compile(r"""(?<![\w-])href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE)
+# A link marked as the page being shown, and one to the page after it.
+_CURRENT_LINK = re.compile(r"""\baria-current\s*=\s*["']?(?:page|true)\b""", re.IGNORECASE)
+_NEXT_LINK = re.compile(r"""\brel\s*=\s*["']?next\b|\baria-label\s*=\s*["']?next\b""", re.IGNORECASE)
+_NEXT_LABEL = re.compile(r"^(?:next\b.*|[>›»→]+)$", re.IGNORECASE)
+_INNER_TAG = re.compile(r"<[^>]*>")
+_PATH_PAGE = re.compile(r"/page/(\d+)/?$")
+_PLACEHOLDER = "__page__"
+
+
+def _numbered_link(url) -> Optional[Tuple[str, str, int]]:
+    """(kind, URL template, number) when url carries a page number or offset."""
+    match = _PATH_PAGE.search(url.path)
+    if match:
+        path = url.path[:match.start()] + f"/page/{_PLACEHOLDER}"
+        return PAGE, urlunsplit(url._replace(path=path, fragment="")), int(match.group(1))
+
+    pairs = parse_qsl(url.query, keep_blank_values=True)
+    for position, (name, value) in enumerate(pairs):
+        kind = PAGE if name.lower() in PAGE_PARAMETERS else OFFSET if name.lower() in OFFSET_PARAMETERS else None
+        if kind is None or not value.isdigit():
+            continue
+        templated = pairs[:position] + [(name, _PLACEHOLDER)] + pairs[position + 1:]
+        return kind, urlunsplit(url._replace(query=urlencode(templated), fragment="")), int(value)
+    return None
+
+
+def _listing_path(path: str) -> str:
+    return _PATH_PAGE.sub("", path).rstrip("/")
+
+
+def _first_page_number(labels: Dict[int, Set[str]]) -> Optional[int]:
+    """
+    0 or 1, read from links labelled with a page number, e.g. "?page=1"
+    labelled "2" numbers pages from 0. None when no link says.
+    """
+    offsets = [
+        int(label) - number
+        for number, texts in labels.items()
+        for label in texts
+        if label.isdigit()
+    ]
+    if not offsets:
+        return None
+    return 0 if offsets.count(1) > offsets.count(0) else 1
+
+
+def _current_page_number(labels: Dict[int, Set[str]], current: Set[int], following: Set[int]) -> int:
+    """
+    Number of the page the links were read from when its URL carries none,
+    from the strongest evidence on the page: a link marked as the current
+    page, numbered labels, a "Next" link, and otherwise 0 when ?page=0 is
+    linked and 1 when it is not.
+    """
+    if current:
+        return min(current)
+    first_page = _first_page_number(labels)
+    if first_page is not None:
+        return first_page
+    if following:
+        return min(following) - 1
+    return 0 if 0 in labels else 1
+
+
+def find_page_urls(document: str, page_url: str, max_pages: int = MAX_LISTING_PAGES) -> List[str]:
+    """
+    URLs of the listing pages after page_url, read from its pagination links.
+
+    Links on the same listing that differ only in a page number (?page=3,
+    /page/3) or a result offset (?start=40) are grouped, and the group with
+    the most distinct numbers is taken as the pagination. Gaps up to the
+    highest number linked are filled in, so "1 2 3 ... 12" yields every
+    page, capped at max_pages - 1. Returns an empty list when the page has
+    no such links, e.g. when pagination only works through JavaScript.
+
+    Only pages after page_url are returned, never page_url itself. A
+    windowed pager ("1 2 3 4 5 ... Next") only links a few pages ahead, so
+    callers continue from the last page loaded to find the ones after it.
+    Page numbers may start at 0 or 1; when page_url has none, which page it
+    is comes from _current_page_number.
+    """
+    current = urlsplit(page_url)
+    current_path = _listing_path(current.path)
+    groups: Dict[Tuple[str, str], Dict[int, Set[str]]] = {}
+    current_numbers: Dict[Tuple[str, str], Set[int]] = {}
+    next_numbers: Dict[Tuple[str, str], Set[int]] = {}
+    for match in _ANCHOR.finditer(document):
+        attributes = match.group(1)
+        href = _HREF.search(attributes)
+        if href is None:
+            continue
+        href = html.unescape(href.group(1) or href.group(2) or href.group(3) or "").strip()
+        if not href or href.startswith(("#", "javascript:", "mailto:", "tel:")):
+            continue
+        link = urlsplit(urljoin(page_url, href))
+        if link.netloc != current.netloc or _listing_path(link.path) != current_path:
+            continue
+        numbered = _numbered_link(link)
+        if numbered is None:
+            continue
+        kind, template, number = numbered
+        label = " ".join(html.unescape(_INNER_TAG.sub(" ", match.group(2))).split())
+        groups.setdefault((kind, template), {}).setdefault(number, set()).add(label)
+        if _CURRENT_LINK.search(attributes):
+            current_numbers.setdefault((kind, template), set()).add(number)
+        if _NEXT_LINK.search(attributes) or _NEXT_LABEL.match(label):
+            next_numbers.setdefault((kind, template), set()).add(number)
+    if not groups:
+        return []
+
+    key, labels = max(groups.items(), key=lambda group: len(group[1]))
+    kind, template = key
+    own = _numbered_link(current)
+    if own is not None and own[:2] == key:
+        position = own[2]
+    elif kind == PAGE:
+        position = _current_page_number(labels, current_numbers.get(key, set()), next_numbers.get(key, set()))
+    else:
+        position = 0
+
+    later = sorted(number for number in labels if number > position)
+    if not later:
+        return []
+    step = 1 if kind == PAGE else later[0] - position
+    targets = range(position + step, later[-1] + 1, step)
+    page_urls = [template.replace(_PLACEHOLDER, str(number)) for number in targets]
+    return [url for url in page_urls if url != page_url][:max_pages - 1]
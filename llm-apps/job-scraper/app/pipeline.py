@@ -0,0 +1,327 @@
+import asyncio
+import logging
+from typing import AsyncIterator, List, Optional, Tuple
+
+from decouple import config
+
+from .extractors import match_job_urls
+from .fetcher import page_fetcher
+from .prompts1 import (
+    BATCH_EXTRACTION,
+    BATCH_MAX_JOBS,
+    BATCH_TOKENS,
+    extract_job_information,
+    extract_job_information_batch,
+    extract_job_urls,
+    fits_in_batch,
+)
+from .schemas import JobInformationSchema
+from .scraper1 import iter_listing_pages
+from .utils import CHARS_PER_TOKEN, fix_url, reduce_listing_html, remove_html_tags
+
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_CONCURRENCY = config("JOB_SCRAPER_SCRAPE_CONCURRENCY", default=5, cast=int)
+EXTRACT_CONCURRENCY = config("JOB_SCRAPER_EXTRACT_CONCURRENCY", default=10, cast=int)
+# Seconds a job page waits for others to share its batched extraction call.
+BATCH_MAX_WAIT = config("JOB_SCRAPER_BATCH_MAX_WAIT", default=0.5, cast=float)
+
+reduction_stats = {"pages": 0, "chars_before": 0, "chars_after": 0}
+
+# Listing pages handled by each URL discovery path: a rule name or "llm".
+discovery_stats = {}
+
+
+def resolve_job_url(job_url: str) -> str:
+    return job_url if 'https://' in job_url else fix_url(url=job_url)
+
+
+async def reduce_listing_page(document: str) -> str:
+    reduced = await asyncio.to_thread(reduce_listing_html, document)
+    reduction_stats["pages"] += 1
+    reduction_stats["chars_before"] += len(document)
+    reduction_stats["chars_after"] += len(reduced)
+    logger.info(
+        "Reduced listing page from %d to %d chars (~%d to ~%d tokens)",
+        len(document), len(reduced),
+        len(document) // CHARS_PER_TOKEN, len(reduced) // CHARS_PER_TOKEN,
+    )
+    return reduced
+
+
+def get_reduction_stats() -> dict:
+    before, after = reduction_stats["chars_before"], reduction_stats["chars_after"]
+    return {
+        **reduction_stats,
+        "estimated_tokens_saved": (before - after) // CHARS_PER_TOKEN,
+        "ratio": after / before if before else 1.0,
+    }
+
+
+def get_discovery_stats() -> dict:
+    return {
+        "handled_by": dict(discovery_stats),
+        "llm_calls_avoided": sum(
+            count for path, count in discovery_stats.items() if path != "llm"
+        ),
+    }
+
+
+async def _discover_page_urls(
+    document: str, base_url: str, semaphore: asyncio.Semaphore
+) -> Optional[List[str]]:
+    handled_by, urls = match_job_urls(document, base_url)
+    if handled_by is None:
+        handled_by = "llm"
+        reduced = await reduce_listing_page(document)
+        async with semaphore:
+            results = await extract_job_urls(home_page_html_document=reduced)
+        for url_object in results:
+            if url_object.urls is None:
+                return None
+            urls.extend(url_object.urls)
+    discovery_stats[handled_by] = discovery_stats.get(handled_by, 0) + 1
+    logger.info("Found %d job URLs on a listing page via %s", len(urls), handled_by)
+    return urls
+
+
+def _merge_page_urls(page_urls: List[Optional[List[str]]]) -> Optional[List[str]]:
+    if any(urls is None for urls in page_urls):
+        return None
+    # A listing page can be loaded twice when its numbering is ambiguous.
+    return list(dict.fromkeys(url for urls in page_urls for url in urls))
+
+
+async def discover_job_urls(
+    documents: List[str], base_url: str, extract_concurrency: int = EXTRACT_CONCURRENCY
+) -> Optional[List[str]]:
+    """
+    Extract job URLs from every listing page.
+
+    Known ATS layouts are matched by URL rules first; only pages no rule
+    finds anything on go through reduction and the LLM, at most
+    extract_concurrency calls at a time. Pages are handled concurrently and
+    their URLs returned in page order. Returns None when the model reports
+    no URL list at all for a page, which the caller treats as an empty
+    careers page.
+    """
+    semaphore = asyncio.Semaphore(extract_concurrency)
+    page_urls = await asyncio.gather(
+        *(_discover_page_urls(document, base_url, semaphore) for document in documents)
+    )
+    return _merge_page_urls(page_urls)
+
+
+async def _scrape_listing(
+    url: str, extract_concurrency: int = EXTRACT_CONCURRENCY
+) -> Tuple[int, asyncio.Future]:
+    """
+    Scrape every page of the listing at url, starting URL discovery on each
+    page as soon as it has loaded.
+
+    Returns once the last page is scraped, with the page count and a future
+    for the per-page URL lists in page order; discovery may still be running.
+    """
+    semaphore = asyncio.Semaphore(extract_concurrency)
+    tasks = {}
+    try:
+        async for number, document in iter_listing_pages(url):
+            tasks[number] = asyncio.create_task(_discover_page_urls(document, url, semaphore))
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    return len(tasks), asyncio.gather(*(tasks[number] for number in sorted(tasks)))
+
+
+async def discover_listing_job_urls(url: str) -> Tuple[int, Optional[List[str]]]:
+    """
+    Scrape every page of the listing at url and extract its job URLs.
+
+    LLM calls for pages already loaded overlap with loading the rest.
+    Returns the number of pages scraped and the URLs in page order, or None
+    as discover_job_urls does.
+    """
+    pages_scraped, discovery = await _scrape_listing(url)
+    return pages_scraped, _merge_page_urls(await discovery)
+
+
+class ExtractionBatcher:
+    """
+    Collect job pages as they are scraped and extract them in batches.
+
+    A batch is sent once adding a page would exceed token_budget, once it
+    holds max_jobs pages, or max_wait seconds after its first page arrived.
+    Each batched call, and each single call a failed batch falls back to,
+    takes one slot of semaphore, like single extraction calls. Pages too
+    long to share a call are extracted on their own.
+    """
+
+    def __init__(
+        self,
+        semaphore: asyncio.Semaphore,
+        token_budget: int = BATCH_TOKENS,
+        max_jobs: int = BATCH_MAX_JOBS,
+        max_wait: float = BATCH_MAX_WAIT,
+    ):
+        self.semaphore = semaphore
+        self.token_budget = token_budget
+        self.max_jobs = max_jobs
+        self.max_wait = max_wait
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    async def extract(self, html_document: str, apply_url: str) -> List[JobInformationSchema]:
+        if not fits_in_batch(html_document):
+            async with self.semaphore:
+                return await extract_job_information(html_document=html_document, apply_url=apply_url)
+
+        tokens = len(html_document) // CHARS_PER_TOKEN
+        if self._pending and self._pending_tokens + tokens > self.token_budget:
+            self._flush()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((html_document, apply_url, future))
+        self._pending_tokens += tokens
+        if len(self._pending) >= self.max_jobs:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_tokens = self._pending, [], 0
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, str, asyncio.Future]]) -> None:
+        try:
+            results = await extract_job_information_batch(
+                [(html_document, apply_url) for html_document, apply_url, _ in batch],
+                semaphore=self.semaphore,
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), job_results in zip(batch, results):
+            if not future.done():
+                future.set_result(job_results)
+
+    def close(self) -> None:
+        """Drop pages still waiting for a batch and cancel batches in flight."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for _, _, future in self._pending:
+            future.cancel()
+        self._pending = []
+        for task in self._tasks:
+            task.cancel()
+
+
+async def iter_jobs(
+    job_urls: List[str],
+    scrape_concurrency: int = SCRAPE_CONCURRENCY,
+    extract_concurrency: int = EXTRACT_CONCURRENCY,
+) -> AsyncIterator[Tuple[int, List[JobInformationSchema]]]:
+    """
+    Scrape and extract every job URL through a two-stage pipeline.
+
+    Each stage has its own semaphore, so page loads for later jobs overlap
+    with LLM extraction of earlier ones. With batch extraction on, short
+    pages share calls through an ExtractionBatcher. Yields (index into job_urls, results)
+    as each job finishes; a job whose page fails to load is logged and yields
+    no results. Closing the iterator early cancels the jobs still running.
+    """
+    scrape_semaphore = asyncio.Semaphore(scrape_concurrency)
+    extract_semaphore = asyncio.Semaphore(extract_concurrency)
+    batcher = ExtractionBatcher(extract_semaphore) if BATCH_EXTRACTION else None
+
+    async def process(index: int, job_url: str) -> Tuple[int, List[JobInformationSchema]]:
+        target_url = resolve_job_url(job_url)
+        try:
+            async with scrape_semaphore:
+                html = await page_fetcher.fetch(target_url)
+        except Exception as e:
+            logger.warning("Skipping %s: %s", target_url, e)
+            return index, []
+
+        soup = await asyncio.to_thread(remove_html_tags, html)
+        if batcher is not None:
+            job_results = await batcher.extract(soup, target_url)
+        else:
+            async with extract_semaphore:
+                job_results = await extract_job_information(
+                    html_document=soup, apply_url=target_url
+                )
+        return index, [job_info for job_info in job_results if job_info is not None]
+
+    tasks = [asyncio.create_task(process(index, job_url)) for index, job_url in enumerate(job_urls)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        if batcher is not None:
+            batcher.close()
+
+
+async def extract_jobs(
+    job_urls: List[str],
+    scrape_concurrency: int = SCRAPE_CONCURRENCY,
+    extract_concurrency: int = EXTRACT_CONCURRENCY,
+) -> List[JobInformationSchema]:
+    """Run iter_jobs to completion and return the results in job_urls order."""
+    results: List[List[JobInformationSchema]] = [[] for _ in job_urls]
+    async for index, job_results in iter_jobs(job_urls, scrape_concurrency, extract_concurrency):
+        results[index] = job_results
+    return [job_info for job_results in results for job_info in job_results]
+
+
+async def job_events(url: str) -> AsyncIterator[dict]:
+    """
+    Run a whole careers-page scrape, yielding progress and job events.
+
+    Every event is a JSON-ready dict with an "event" key: pages_scraped,
+    urls_discovered, job (one per extracted job) or skipped (a job page that
+    produced nothing), then done, or error when the careers page has nothing
+    to scrape.
+    """
+    pages_scraped, discovery = await _scrape_listing(url)
+    try:
+        yield {"event": "pages_scraped", "count": pages_scraped}
+        total_urls = _merge_page_urls(await discovery)
+    finally:
+        discovery.cancel()
+
+    if total_urls is None:
+        yield {"event": "error", "message": "The career page is empty. Nothing to scrape."}
+        return
+    yield {"event": "urls_discovered", "count": len(total_urls)}
+
+    processed = 0
+    extracted = 0
+    async for index, job_results in iter_jobs(total_urls):
+        processed += 1
+        if not job_results:
+            yield {"event": "skipped", "index": index, "processed": processed, "total": len(total_urls)}
+        for job_info in job_results:
+            extracted += 1
+            yield {
+                "event": "job",
+                "index": index,
+                "processed": processed,
+                "total": len(total_urls),
+                "data": job_info.model_dump(),
+            }
+    yield {"event": "done", "processed": processed, "extracted": extracted}
@@ -1,17 +1,11 @@
 import json
-import boto3
-from decouple import config
 
+from .clients import get_bedrock_client
 from .schemas import JobInformationSchema, JobInformationURL
 
 
 def get_client():
-    return boto3.client(
-        "bedrock-runtime",
-        region_name=config("AWS_REGION_NAME"),
-        aws_access_key_id=config("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=config("AWS_SECRET_ACCESS_KEY"),
-    )
+    return get_bedrock_client()
 
 
 def _call_model(prompt: str, max_tokens: int = 2048) -> str:
@@ -1,17 +1,41 @@
+import asyncio
+import logging
+from contextlib import nullcontext
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from decouple import config
 from langchain_aws import ChatBedrock
 from langchain_core.prompts import ChatPromptTemplate
-from decouple import config
+from langchain_core.runnables import Runnable
+
+from .cache import extraction_cache
+from .clients import get_bedrock_client, shared_instance
+from .schemas import JobInformationBatch, JobInformationSchema, JobInformationURL
+from .utils import CHARS_PER_TOKEN, split_text
+
+
+logger = logging.getLogger(__name__)
 
-from .schemas import JobInformationSchema, JobInformationURL
+MODEL_ID = "global.amazon.nova-2-lite-v1:0"
 
+# Job pages longer than this many estimated tokens are extracted in chunks.
+CHUNK_THRESHOLD_TOKENS = config("JOB_SCRAPER_CHUNK_THRESHOLD_TOKENS", default=12000, cast=int)
+CHUNK_TOKENS = config("JOB_SCRAPER_CHUNK_TOKENS", default=6000, cast=int)
+CHUNK_CONCURRENCY = config("JOB_SCRAPER_CHUNK_CONCURRENCY", default=4, cast=int)
 
+# Short job pages are packed into one call up to this many estimated tokens.
+# Descriptions come back in full, so the budget bounds the response too.
+BATCH_EXTRACTION = config("JOB_SCRAPER_BATCH_EXTRACTION", default=True, cast=bool)
+BATCH_TOKENS = config("JOB_SCRAPER_BATCH_TOKENS", default=6000, cast=int)
+BATCH_MAX_JOBS = config("JOB_SCRAPER_BATCH_MAX_JOBS", default=8, cast=int)
+
+batch_stats = {"batches": 0, "jobs": 0, "fallbacks": 0}
+
+
+@shared_instance
 def _chat_bedrock() -> ChatBedrock:
-    return ChatBedrock(
-        model_id="global.amazon.nova-2-lite-v1:0",
-        region_name=config("AWS_REGION_NAME"),
-        aws_access_key_id=config("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=config("AWS_SECRET_ACCESS_KEY"),
-    )
+    return ChatBedrock(model_id=MODEL_ID, client=get_bedrock_client())
 
 
 URLS_PROMPT = ChatPromptTemplate.from_messages(
@@ -57,27 +81,163 @@ HTML Document:
 )
 
 
+JOB_INFO_CHUNK_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """You are an HTML parser. The user message holds one part of a job page that was too long to send at once.
+
+Extract from this part only:
+- job_title: the title of the job position, or null if this part does not name it
+- job_description: the job description text in this part as plain text, or null if there is none
+- company_name: name of the hiring company, or null if this part does not name it
+- company_website: company website URL if present, otherwise null
+- apply_url: use the apply URL provided in the user message""",
+        ),
+        (
+            "human",
+            """Apply URL: {apply_url}
+
+Part {part} of {parts}:
+{html_document}""",
+        ),
+    ]
+)
+
+
+JOB_INFO_BATCH_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """You are an HTML parser. The user message holds several job pages, each starting with a "### Job N" header and its apply URL.
+
+Return structured data with a field "jobs": one entry per job page, in the same order, with:
+- job_title: the title of the job position
+- job_description: full job description as plain text (no HTML tags)
+- company_name: name of the hiring company
+- company_website: company website URL if present, otherwise null
+- apply_url: the apply URL given in that job's header
+
+Never merge jobs or take a field from another job's page.""",
+        ),
+        (
+            "human",
+            """{job_documents}""",
+        ),
+    ]
+)
+
+
+@shared_instance
+def _urls_chain() -> Runnable:
+    return URLS_PROMPT | _chat_bedrock().with_structured_output(JobInformationURL)
+
+
+@shared_instance
+def _job_info_chain() -> Runnable:
+    return JOB_INFO_PROMPT | _chat_bedrock().with_structured_output(JobInformationSchema)
+
+
+@shared_instance
+def _job_info_chunk_chain() -> Runnable:
+    return JOB_INFO_CHUNK_PROMPT | _chat_bedrock().with_structured_output(JobInformationSchema)
+
+
+@shared_instance
+def _job_info_batch_chain() -> Runnable:
+    return JOB_INFO_BATCH_PROMPT | _chat_bedrock().with_structured_output(JobInformationBatch)
+
+
+def build_chains() -> None:
+    """Build the Bedrock client and structured-output chains ahead of the first request."""
+    _urls_chain()
+    _job_info_chain()
+    _job_info_chunk_chain()
+    _job_info_batch_chain()
+
+
 async def extract_job_urls(home_page_html_document: str) -> list[JobInformationURL]:
-    llm = _chat_bedrock()
-    structured_llm = llm.with_structured_output(JobInformationURL)
-    chain = URLS_PROMPT | structured_llm
+    cache_key, cached = await extraction_cache.lookup(
+        MODEL_ID, URLS_PROMPT.pretty_repr(), home_page_html_document=home_page_html_document
+    )
+    if cached is not None:
+        return [JobInformationURL.model_validate_json(cached)]
+
     try:
-        result = await chain.ainvoke(
+        result = await _urls_chain().ainvoke(
             {"home_page_html_document": home_page_html_document}
         )
         if result is None:
             return [JobInformationURL(urls=[])]
+        await extraction_cache.aset(cache_key, result.model_dump_json())
         return [result]
     except Exception:
         return [JobInformationURL(urls=[])]
 
 
+def merge_job_information(parts: List[JobInformationSchema], apply_url: str) -> JobInformationSchema:
+    """
+    Combine the fields extracted from each chunk of one job page.
+
+    Scalar fields take the first value any chunk found, in page order; the
+    description is every chunk's description joined in page order, skipping
+    repeats of text an earlier chunk already returned.
+    """
+    def first(field: str):
+        return next((getattr(part, field) for part in parts if getattr(part, field)), None)
+
+    descriptions = []
+    for part in parts:
+        description = (part.job_description or "").strip()
+        if description and description not in descriptions:
+            descriptions.append(description)
+    return JobInformationSchema(
+        job_title=first("job_title"),
+        job_description="\n\n".join(descriptions) or None,
+        company_name=first("company_name"),
+        company_website=first("company_website"),
+        apply_url=apply_url,
+    )
+
+
+async def _extract_job_information_in_chunks(
+    html_document: str, apply_url: str
+) -> Optional[JobInformationSchema]:
+    """Extract every chunk of an oversized page concurrently and merge the results."""
+    chunks = split_text(html_document, CHUNK_TOKENS * CHARS_PER_TOKEN)
+    logger.info(
+        "Extracting %s in %d chunks (~%d tokens)",
+        apply_url, len(chunks), len(html_document) // CHARS_PER_TOKEN,
+    )
+    results = await _job_info_chunk_chain().abatch(
+        [
+            {"html_document": chunk, "apply_url": apply_url, "part": part, "parts": len(chunks)}
+            for part, chunk in enumerate(chunks, start=1)
+        ],
+        config={"max_concurrency": CHUNK_CONCURRENCY},
+        return_exceptions=True,
+    )
+    parts = [result for result in results if isinstance(result, JobInformationSchema)]
+    if len(parts) < len(chunks):
+        logger.warning("%d of %d chunks of %s failed to extract", len(chunks) - len(parts), len(chunks), apply_url)
+    if not parts:
+        return None
+    return merge_job_information(parts, apply_url)
+
+
+async def _job_info_cache_lookup(html_document: str, apply_url: str) -> Tuple[str, Optional[str]]:
+    return await extraction_cache.lookup(
+        MODEL_ID, JOB_INFO_PROMPT.pretty_repr(), html_document=html_document, apply_url=apply_url
+    )
+
+
 async def extract_job_information(
     html_document: str, apply_url: str
 ) -> list[JobInformationSchema]:
-    llm = _chat_bedrock()
-    structured_llm = llm.with_structured_output(JobInformationSchema)
-    chain = JOB_INFO_PROMPT | structured_llm
+    cache_key, cached = await _job_info_cache_lookup(html_document, apply_url)
+    if cached is not None:
+        return [JobInformationSchema.model_validate_json(cached)]
+
     fallback = JobInformationSchema(
         job_title=None,
         job_description=None,
@@ -86,11 +246,132 @@ async def extract_job_information(
         apply_url=apply_url,
     )
     try:
-        result = await chain.ainvoke(
-            {"html_document": html_document, "apply_url": apply_url}
-        )
+        if len(html_document) > CHUNK_THRESHOLD_TOKENS * CHARS_PER_TOKEN:
+            result = await _extract_job_information_in_chunks(html_document, apply_url)
+        else:
+            result = await _job_info_chain().ainvoke(
+                {"html_document": html_document, "apply_url": apply_url}
+            )
         if result is None:
             return [fallback]
+        await extraction_cache.aset(cache_key, result.model_dump_json())
         return [result]
     except Exception:
         return [fallback]
+
+
+def fits_in_batch(html_document: str) -> bool:
+    """Whether a page is short enough to share a batched extraction call."""
+    return len(html_document) <= BATCH_TOKENS * CHARS_PER_TOKEN
+
+
+def _format_job_documents(documents: List[Tuple[str, str]]) -> str:
+    return "\n\n".join(
+        f"### Job {number}\nApply URL: {apply_url}\n\n{html_document}"
+        for number, (html_document, apply_url) in enumerate(documents, start=1)
+    )
+
+
+def _normalize_url(url: Optional[str]) -> str:
+    parts = urlsplit((url or "").strip())
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, "")
+    )
+
+
+def _match_batch_results(
+    jobs: List[JobInformationSchema], apply_urls: List[str]
+) -> List[Optional[JobInformationSchema]]:
+    """
+    The job the batch response returned for each apply URL, or None.
+
+    Jobs are matched on their normalized apply URL only. Lining them up by
+    position would cache one posting's fields under another page's key if
+    the model reordered or merged jobs.
+    """
+    by_url = {}
+    for job in jobs:
+        by_url.setdefault(_normalize_url(job.apply_url), job)
+    matched = []
+    for apply_url in apply_urls:
+        job = by_url.get(_normalize_url(apply_url))
+        matched.append(None if job is None else job.model_copy(update={"apply_url": apply_url}))
+    return matched
+
+
+async def _extract_one(
+    html_document: str, apply_url: str, semaphore: Optional[asyncio.Semaphore]
+) -> List[JobInformationSchema]:
+    async with semaphore or nullcontext():
+        return await extract_job_information(html_document, apply_url)
+
+
+async def extract_job_information_batch(
+    documents: List[Tuple[str, str]], semaphore: Optional[asyncio.Semaphore] = None
+) -> List[List[JobInformationSchema]]:
+    """
+    Extract several (html_document, apply_url) pages with one structured-output call.
+
+    Cached pages are served from the cache and the rest are sent together;
+    results are cached per page under the same key extract_job_information
+    uses. Pages the response has no job for (matched by apply URL), or all
+    of them if the call fails, fall back to their own extract_job_information
+    call. When semaphore is given, it is held for the batched call and for
+    each fallback call separately. Returns one result list per document, in
+    order.
+    """
+    results: List[Optional[List[JobInformationSchema]]] = [None] * len(documents)
+    lookups = await asyncio.gather(
+        *(_job_info_cache_lookup(html_document, apply_url) for html_document, apply_url in documents)
+    )
+    pending = [index for index, (_, cached) in enumerate(lookups) if cached is None]
+    for index, (_, cached) in enumerate(lookups):
+        if cached is not None:
+            results[index] = [JobInformationSchema.model_validate_json(cached)]
+
+    unmatched = pending
+    if len(pending) > 1:
+        batch = [documents[index] for index in pending]
+        matched: List[Optional[JobInformationSchema]] = [None] * len(batch)
+        error = "no usable response"
+        try:
+            async with semaphore or nullcontext():
+                response = await _job_info_batch_chain().ainvoke(
+                    {"job_documents": _format_job_documents(batch)}
+                )
+            if response is not None:
+                matched = _match_batch_results(response.jobs, [apply_url for _, apply_url in batch])
+                error = "no job returned for their apply URL"
+        except Exception as e:
+            error = e
+
+        batch_stats["batches"] += 1
+        batch_stats["jobs"] += len(batch)
+        unmatched = []
+        for index, job in zip(pending, matched):
+            if job is None:
+                unmatched.append(index)
+            else:
+                await extraction_cache.aset(lookups[index][0], job.model_dump_json())
+                results[index] = [job]
+        if unmatched:
+            batch_stats["fallbacks"] += len(unmatched)
+            logger.warning(
+                "Batched extraction missed %d of %d jobs (%s); extracting them one by one",
+                len(unmatched), len(batch), error,
+            )
+
+    singles = await asyncio.gather(
+        *(_extract_one(*documents[index], semaphore) for index in unmatched)
+    )
+    for index, single in zip(unmatched, singles):
+        results[index] = single
+    return results
+
+
+def get_batch_stats() -> dict:
+    return {
+        **batch_stats,
+        "enabled": BATCH_EXTRACTION,
+        "jobs_per_call": batch_stats["jobs"] / batch_stats["batches"] if batch_stats["batches"] else 0.0,
+    }
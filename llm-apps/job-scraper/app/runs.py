@@ -0,0 +1,241 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from decouple import config
+
+from .pipeline import job_events
+
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Most results one GET /runs/{id}/results request returns.
+MAX_RESULTS_PAGE_SIZE = 1000
+
+
+class RunQueue:
+    """
+    A persistent queue of careers-page scrapes executed in the background.
+
+    Runs and their results are stored in SQLite as they progress, so partial
+    results can be read while a run is still going. At most max_concurrent_runs
+    execute at once; runs left "running" by a previous process are queued
+    again from scratch on start. Every SQLite call runs in a worker thread,
+    so concurrent runs and the polling endpoints never block the event loop.
+    """
+
+    def __init__(self, path: str, max_concurrent_runs: int = 2):
+        self.path = path
+        self.max_concurrent_runs = max_concurrent_runs
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS runs (
+                    id TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    pages INTEGER,
+                    total_urls INTEGER,
+                    processed INTEGER NOT NULL DEFAULT 0,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS ix_runs_status_created_at ON runs (status, created_at);
+                CREATE TABLE IF NOT EXISTS run_results (
+                    run_id TEXT NOT NULL REFERENCES runs (id),
+                    position INTEGER NOT NULL,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_run_results_run_id ON run_results (run_id, position);
+                """
+            )
+        return self._conn
+
+    def _write(self, *statements: Tuple[str, tuple]) -> int:
+        """Execute statements in one transaction; the row count of the last one."""
+        with self._lock:
+            conn = self._connection()
+            rowcount = 0
+            for sql, parameters in statements:
+                rowcount = conn.execute(sql, parameters).rowcount
+            conn.commit()
+            return rowcount
+
+    def _read(self, sql: str, parameters: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._connection().execute(sql, parameters).fetchall()
+
+    async def _awrite(self, *statements: Tuple[str, tuple]) -> int:
+        return await asyncio.to_thread(self._write, *statements)
+
+    async def _aread(self, sql: str, parameters: tuple = ()) -> List[sqlite3.Row]:
+        return await asyncio.to_thread(self._read, sql, parameters)
+
+    async def start(self) -> None:
+        # Interrupted runs start over, so drop what they had already stored.
+        await self._awrite(
+            ("DELETE FROM run_results WHERE run_id IN (SELECT id FROM runs WHERE status = ?)", (RUNNING,)),
+            ("UPDATE runs SET status = ?, started_at = NULL, processed = 0 WHERE status = ?", (QUEUED, RUNNING)),
+        )
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.max_concurrent_runs)
+        ]
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def submit(self, url: str) -> str:
+        run_id = uuid.uuid4().hex
+        await self._awrite((
+            "INSERT INTO runs (id, url, status, created_at) VALUES (?, ?, ?, ?)",
+            (run_id, url, QUEUED, time.time()),
+        ))
+        self._wakeup.set()
+        return run_id
+
+    def _get(self, run_id: str) -> Optional[dict]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            run = dict(row)
+            run["results"] = conn.execute(
+                "SELECT COUNT(*) FROM run_results WHERE run_id = ?", (run_id,)
+            ).fetchone()[0]
+            return run
+
+    async def get(self, run_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self._get, run_id)
+
+    async def results(self, run_id: str, offset: int = 0, limit: int = 100) -> List[dict]:
+        if offset < 0 or limit < 1:
+            raise ValueError("offset must be at least 0 and limit at least 1")
+        rows = await self._aread(
+            "SELECT data FROM run_results WHERE run_id = ? ORDER BY position LIMIT ? OFFSET ?",
+            (run_id, limit, offset),
+        )
+        return [json.loads(row["data"]) for row in rows]
+
+    async def cancel(self, run_id: str) -> bool:
+        """Cancel a queued or running run. Returns False if it had already finished."""
+        cancelled = await self._awrite((
+            "UPDATE runs SET status = ?, finished_at = ? WHERE id = ? AND status IN (?, ?)",
+            (CANCELLED, time.time(), run_id, QUEUED, RUNNING),
+        ))
+        task = self._running.get(run_id)
+        if task is not None:
+            task.cancel()
+        return cancelled > 0
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT id, url FROM runs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE runs SET status = ?, started_at = ? WHERE id = ?",
+                    (RUNNING, time.time(), row["id"]),
+                )
+                conn.commit()
+            return row
+
+    async def _worker(self) -> None:
+        while True:
+            row = await asyncio.to_thread(self._claim)
+            if row is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            task = asyncio.create_task(self._execute(row["id"], row["url"]))
+            self._running[row["id"]] = task
+            try:
+                # Unlike awaiting the task, wait() lets cancel() stop the run
+                # without stopping this worker, and vice versa.
+                await asyncio.wait([task])
+            finally:
+                if not task.done():
+                    task.cancel()
+                self._running.pop(row["id"], None)
+
+    async def _finish(self, run_id: str, status: str, error: Optional[str] = None) -> None:
+        await self._awrite((
+            "UPDATE runs SET status = ?, finished_at = ?, error = ? WHERE id = ? AND status = ?",
+            (status, time.time(), error, run_id, RUNNING),
+        ))
+
+    async def _execute(self, run_id: str, url: str) -> None:
+        position = 0
+        try:
+            async for event in job_events(url):
+                kind = event["event"]
+                if kind == "pages_scraped":
+                    await self._awrite(("UPDATE runs SET pages = ? WHERE id = ?", (event["count"], run_id)))
+                elif kind == "urls_discovered":
+                    await self._awrite(("UPDATE runs SET total_urls = ? WHERE id = ?", (event["count"], run_id)))
+                elif kind == "skipped":
+                    await self._awrite(("UPDATE runs SET processed = ? WHERE id = ?", (event["processed"], run_id)))
+                elif kind == "job":
+                    await self._awrite(
+                        ("UPDATE runs SET processed = ? WHERE id = ?", (event["processed"], run_id)),
+                        (
+                            "INSERT INTO run_results (run_id, position, data) VALUES (?, ?, ?)",
+                            (run_id, position, json.dumps(event["data"])),
+                        ),
+                    )
+                    position += 1
+                elif kind == "error":
+                    await self._finish(run_id, FAILED, event["message"])
+                    return
+        except Exception as e:
+            logger.exception("Run %s failed", run_id)
+            await self._finish(run_id, FAILED, str(e))
+            return
+        await self._finish(run_id, COMPLETED)
+
+    async def stats(self) -> dict:
+        rows = await self._aread("SELECT status, COUNT(*) AS count FROM runs GROUP BY status")
+        return {
+            "max_concurrent_runs": self.max_concurrent_runs,
+            "running": len(self._running),
+            "by_status": {row["status"]: row["count"] for row in rows},
+        }
+
+
+run_queue = RunQueue(
+    path=config("JOB_SCRAPER_RUNS_PATH", default="job_scraper_runs.db"),
+    max_concurrent_runs=config("JOB_SCRAPER_MAX_CONCURRENT_RUNS", default=2, cast=int),
+)
@@ -13,4 +13,7 @@ class JobInformationSchema(BaseModel):
     company_name: Union[str, None] = Field(description="Job company")
     company_website: Union[str, None] = Field(description="Job company website")
     apply_url: Union[str, None] = Field(description="Job url")
-    
\ No newline at end of file
+    
+
+class JobInformationBatch(BaseModel):
+    jobs: List[JobInformationSchema] = Field(description="One entry per job document, in document order")
@@ -1,13 +1,26 @@
 import asyncio
+import logging
 import sys
-from typing import List
+from typing import List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
 
 from playwright.sync_api import sync_playwright
 
+from .blocking import block_unneeded_requests_sync
+from .pagination import MAX_LISTING_PAGES, PAGE_TIMEOUT, find_page_urls
 
-def _run_scrape_sync(url: str, is_paginated: bool) -> List[str]:
+
+logger = logging.getLogger(__name__)
+
+# Listing pages loading in the browser at once when pagination is by URL.
+PAGE_LOAD_WINDOW = 5
+
+
+def _run_scrape_sync(url: str, is_paginated: bool, block_resources: Optional[bool] = None) -> List[str]:
     """Run playwright synchronously in a thread to avoid Windows event loop issues."""
+    if block_resources is None:
+        block_resources = not is_paginated
+
     with sync_playwright() as playwright:
         browser = playwright.chromium.launch(
             headless=True,
@@ -18,10 +31,12 @@ def _run_scrape_sync(url: str, is_paginated: bool) -> List[str]:
             ]
         )
         page = browser.new_page()
-        page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        if block_resources:
+            block_unneeded_requests_sync(page)
+        page.goto(url, wait_until="domcontentloaded", timeout=PAGE_TIMEOUT * 1000)
 
         if is_paginated:
-            documents = _scrape_paginated_sync(page)
+            documents = _scrape_paginated_sync(page, block_resources)
         else:
             documents = [page.content()]
 
@@ -29,20 +44,79 @@ def _run_scrape_sync(url: str, is_paginated: bool) -> List[str]:
         return documents
 
 
-def _scrape_paginated_sync(page) -> List[str]:
+def _scrape_paginated_sync(page, block_resources: bool = False, max_pages: int = MAX_LISTING_PAGES) -> List[str]:
+    documents = [page.content()]
+    page_urls = find_page_urls(documents[0], page.url, max_pages)
+    if not page_urls:
+        documents.extend(_click_through_pages_sync(page, max_pages))
+        return documents
+
+    # Each round loads the pages linked so far, then reads the last one for
+    # links further on, as windowed and "Next"-only pagers require.
+    seen = {page.url}
+    while len(documents) < max_pages:
+        pending = [page_url for page_url in page_urls if page_url not in seen][:max_pages - len(documents)]
+        if not pending:
+            break
+        seen.update(pending)
+        loaded = _load_pages_sync(page.context.browser, pending, block_resources)
+        documents.extend(document for _, document in loaded)
+        if not loaded:
+            break
+        last_url, last_document = loaded[-1]
+        page_urls = find_page_urls(last_document, last_url, max_pages)
+    return documents
+
+
+def _load_pages_sync(browser, page_urls: List[str], block_resources: bool) -> List[Tuple[str, str]]:
+    """
+    Load listing pages by URL, PAGE_LOAD_WINDOW at a time, as (URL, HTML)
+    in page order; pages that fail to load are left out.
+
+    The sync API drives one thread, so each window's navigations are all
+    started first and then waited on in turn; the browser loads them in
+    parallel meanwhile.
+    """
     documents = []
-    page_number = 1
+    for window_start in range(0, len(page_urls), PAGE_LOAD_WINDOW):
+        window = []
+        for url in page_urls[window_start:window_start + PAGE_LOAD_WINDOW]:
+            listing_page = browser.new_page()
+            if block_resources:
+                block_unneeded_requests_sync(listing_page)
+            try:
+                listing_page.goto(url, wait_until="commit", timeout=PAGE_TIMEOUT * 1000)
+            except Exception as e:
+                logger.warning("Skipping listing page %s: %s", url, e)
+                listing_page.close()
+                continue
+            window.append((url, listing_page))
+        for url, listing_page in window:
+            try:
+                listing_page.wait_for_load_state(state="domcontentloaded", timeout=PAGE_TIMEOUT * 1000)
+                documents.append((url, listing_page.content()))
+            except Exception as e:
+                logger.warning("Skipping listing page %s: %s", url, e)
+            finally:
+                listing_page.close()
+    return documents
+
 
-    while True:
+def _click_through_pages_sync(page, max_pages: int) -> List[str]:
+    documents = []
+    page_number = 1
+    while page_number < max_pages:
         try:
-            documents.append(page.content())
-            page.get_by_role("button", name=str(page_number + 1)).click()
-            page.wait_for_load_state(state="domcontentloaded", timeout=30000)
+            button = page.get_by_role("button", name=str(page_number + 1))
+            if button.count() == 0:
+                break
+            button.first.click(timeout=PAGE_TIMEOUT * 1000)
+            page.wait_for_load_state(state="domcontentloaded", timeout=PAGE_TIMEOUT * 1000)
             page_number += 1
+            documents.append(page.content())
         except Exception as e:
-            print(f"Pagination stopped at page {page_number}: {e}")
+            logger.info("Pagination stopped at page %d: %s", page_number, e)
             break
-
     return documents
 
 
@@ -50,9 +124,10 @@ _executor = ThreadPoolExecutor(max_workers=4)
 
 
 class WebScraper:
-    def __init__(self, url: str, is_paginated: bool = False):
+    def __init__(self, url: str, is_paginated: bool = False, block_resources: Optional[bool] = None):
         self.url = url
         self.is_paginated = is_paginated
+        self.block_resources = block_resources
 
     async def scrape(self) -> List[str]:
         loop = asyncio.get_event_loop()
@@ -60,6 +135,7 @@ class WebScraper:
             _executor,
             _run_scrape_sync,
             self.url,
-            self.is_paginated
+            self.is_paginated,
+            self.block_resources
         )
 
@@ -1,33 +1,247 @@
-from typing import List
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
-from playwright.async_api import Page, async_playwright
+from decouple import config
+from playwright.async_api import Browser, BrowserContext, Page, Playwright, async_playwright
 
+from .blocking import block_unneeded_requests
+from .pagination import MAX_LISTING_PAGES, PAGE_TIMEOUT, find_page_urls
 
-async def scrape_webpage(url: str, is_paginated: bool = False) -> List[str]:
-    async with async_playwright() as playwright:
-        browser = await playwright.chromium.launch(headless=True)
-        page = await browser.new_page()
-        await page.goto(url, wait_until="domcontentloaded", timeout=0)
 
-        if is_paginated:
-            documents = await _scrape_paginated(page)
-        else:
-            documents = [await page.content()]
+logger = logging.getLogger(__name__)
 
-        await browser.close()
-        return documents
 
+class BrowserPool:
+    """
+    A process-wide Chromium pool shared by every scrape.
 
-async def _scrape_paginated(page: Page) -> List[str]:
-    documents = []
+    Pages are handed out in their own browser context, at most max_pages at a
+    time. After pages_per_browser pages the browser is swapped for a fresh one,
+    and the old one is closed once its last page is returned.
+    """
+
+    def __init__(self, max_pages: int = 10, pages_per_browser: int = 100):
+        self.max_pages = max_pages
+        self.pages_per_browser = pages_per_browser
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._open_pages: Dict[Browser, int] = {}
+        self._served_by_browser = 0
+        self._semaphore = asyncio.Semaphore(max_pages)
+        self._lock = asyncio.Lock()
+        self._browsers_launched = 0
+        self._browsers_recycled = 0
+        self._pages_served = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+    async def stop(self) -> None:
+        async with self._lock:
+            for browser in list(self._open_pages):
+                await browser.close()
+            self._open_pages.clear()
+            self._browser = None
+            self._served_by_browser = 0
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    async def _launch(self) -> Browser:
+        browser = await self._playwright.chromium.launch(headless=True)
+        self._open_pages[browser] = 0
+        self._served_by_browser = 0
+        self._browsers_launched += 1
+        return browser
+
+    async def _checkout_browser(self) -> Browser:
+        if self._playwright is None:
+            await self.start()
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                self._open_pages.pop(self._browser, None)
+                self._browser = await self._launch()
+            elif self._served_by_browser >= self.pages_per_browser:
+                retired = self._browser
+                self._browser = await self._launch()
+                self._browsers_recycled += 1
+                if self._open_pages[retired] == 0:
+                    del self._open_pages[retired]
+                    await retired.close()
+            self._served_by_browser += 1
+            self._pages_served += 1
+            self._open_pages[self._browser] += 1
+            return self._browser
+
+    async def _return_browser(self, browser: Browser) -> None:
+        async with self._lock:
+            if browser not in self._open_pages:
+                return
+            self._open_pages[browser] -= 1
+            if browser is not self._browser and self._open_pages[browser] == 0:
+                del self._open_pages[browser]
+                await browser.close()
+
+    @asynccontextmanager
+    async def context(self) -> AsyncIterator[BrowserContext]:
+        async with self._semaphore:
+            browser = await self._checkout_browser()
+            try:
+                context = await browser.new_context()
+                try:
+                    yield context
+                finally:
+                    await context.close()
+            finally:
+                await self._return_browser(browser)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        async with self.context() as context:
+            yield await context.new_page()
+
+    def stats(self) -> dict:
+        return {
+            "running": self.is_running,
+            "max_pages": self.max_pages,
+            "pages_per_browser": self.pages_per_browser,
+            "pages_in_use": sum(self._open_pages.values()),
+            "pages_served": self._pages_served,
+            "open_browsers": len(self._open_pages),
+            "browsers_launched": self._browsers_launched,
+            "browsers_recycled": self._browsers_recycled,
+        }
+
+
+browser_pool = BrowserPool(
+    max_pages=config("JOB_SCRAPER_BROWSER_MAX_PAGES", default=10, cast=int),
+    pages_per_browser=config("JOB_SCRAPER_BROWSER_PAGES_PER_BROWSER", default=100, cast=int),
+)
+
+
+async def scrape_webpage(
+    url: str, is_paginated: bool = False, block_resources: Optional[bool] = None
+) -> List[str]:
+    """
+    Load url and return its HTML, one document per page when is_paginated.
+
+    block_resources aborts images, fonts, media, stylesheets and tracker
+    requests. It defaults to on for single (detail) pages and off for
+    paginated listings, where pagination buttons may depend on styling.
+    """
+    if is_paginated:
+        pages = [page async for page in iter_listing_pages(url, block_resources=bool(block_resources))]
+        return [document for _, document in sorted(pages, key=lambda page: page[0])]
+
+    if block_resources is None:
+        block_resources = True
+    async with browser_pool.page() as page:
+        if block_resources:
+            await block_unneeded_requests(page)
+        await page.goto(url, wait_until="domcontentloaded", timeout=PAGE_TIMEOUT * 1000)
+        return [await page.content()]
+
+
+async def iter_listing_pages(
+    url: str, block_resources: bool = False, max_pages: int = MAX_LISTING_PAGES
+) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Yield (page number, HTML) for every page of a paginated listing as it loads.
+
+    When the first page links to later pages by URL, those are loaded
+    concurrently through the browser pool and yielded in the order they
+    finish; the last of them is then read for links to pages further on, so
+    windowed and "Next"-only pagers are followed to the end. Otherwise the
+    numbered pagination buttons are clicked one page at a time. Either way
+    at most max_pages pages are loaded and every navigation is bounded by
+    JOB_SCRAPER_PAGE_TIMEOUT.
+    """
+    async with browser_pool.page() as page:
+        if block_resources:
+            await block_unneeded_requests(page)
+        await page.goto(url, wait_until="domcontentloaded", timeout=PAGE_TIMEOUT * 1000)
+        first = await page.content()
+        first_url = page.url
+        page_urls = find_page_urls(first, first_url, max_pages)
+        yield 1, first
+
+        if not page_urls:
+            async for numbered_page in _click_through_pages(page, max_pages):
+                yield numbered_page
+            return
+
+    # The first page is back in the pool before the rest are checked out,
+    # so concurrent scrapes cannot hold pages while waiting for more.
+    seen = {first_url}
+    page_count = 1
+    while page_count < max_pages:
+        pending = [page_url for page_url in page_urls if page_url not in seen][:max_pages - page_count]
+        if not pending:
+            return
+        seen.update(pending)
+        logger.info("Loading %d more listing pages of %s by URL", len(pending), url)
+        last = None
+        async for number, page_url, document in _load_pages(pending, page_count + 1, block_resources):
+            if last is None or number > last[0]:
+                last = number, page_url, document
+            yield number, document
+        page_count += len(pending)
+        if last is None:
+            return
+        _, last_url, last_document = last
+        page_urls = find_page_urls(last_document, last_url, max_pages)
+
+
+async def _load_page(number: int, url: str, block_resources: bool) -> Optional[Tuple[int, str, str]]:
+    try:
+        async with browser_pool.page() as page:
+            if block_resources:
+                await block_unneeded_requests(page)
+            await page.goto(url, wait_until="domcontentloaded", timeout=PAGE_TIMEOUT * 1000)
+            return number, url, await page.content()
+    except Exception as e:
+        logger.warning("Skipping listing page %s: %s", url, e)
+        return None
+
+
+async def _load_pages(
+    page_urls: List[str], first_number: int, block_resources: bool
+) -> AsyncIterator[Tuple[int, str, str]]:
+    """Yield (page number, URL, HTML) for page_urls in the order they finish loading."""
+    tasks = [
+        asyncio.create_task(_load_page(number, page_url, block_resources))
+        for number, page_url in enumerate(page_urls, start=first_number)
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            loaded = await next_done
+            if loaded is not None:
+                yield loaded
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _click_through_pages(page: Page, max_pages: int) -> AsyncIterator[Tuple[int, str]]:
     page_number = 1
-    while True:
+    while page_number < max_pages:
         try:
-            documents.append(await page.content())
-            await page.get_by_role("button", name=str(page_number + 1)).click()
-            await page.wait_for_load_state(state="domcontentloaded", timeout=0)
+            button = page.get_by_role("button", name=str(page_number + 1))
+            if await button.count() == 0:
+                return
+            await button.first.click(timeout=PAGE_TIMEOUT * 1000)
+            await page.wait_for_load_state(state="domcontentloaded", timeout=PAGE_TIMEOUT * 1000)
             page_number += 1
+            document = await page.content()
         except Exception as e:
-            print(f"Pagination stopped at page {page_number}: {e}")
-            break
-    return documents
+            logger.info("Pagination stopped at page %d: %s", page_number, e)
+            return
+        yield page_number, document
@@ -1,43 +1,183 @@
+import html
 import re
 from html.parser import HTMLParser
 
 
-class MLStripper(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.reset()
-        self.strict = False
-        self.convert_charrefs = True
-        self.text = []
+# Rough characters-per-token ratio, good enough to compare prompt sizes.
+CHARS_PER_TOKEN = 4
 
-    def handle_data(self, d):
-        
-        self.text.append(d)
+# Elements whose content is never visible text.
+# <head> is not among them: its end tag is optional, and <title> often names
+# the job and company.
+SKIPPED_ELEMENTS = frozenset({"script", "style", "noscript", "template", "svg", "iframe", "object"})
+# Elements that start a new line in rendered text.
+BLOCK_ELEMENTS = frozenset({
+    "address", "article", "aside", "blockquote", "br", "dd", "details", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "summary", "table",
+    "td", "th", "title", "tr", "ul",
+})
 
-    def get_data(self):
-        return ''.join(self.text)
+# One token per match: a comment, CDATA, doctype or processing instruction,
+# or a start/end tag with its name captured. Quoted attribute values may
+# contain ">"; a quote only opens a value right after "=", so an unquoted
+# value such as href=/o'reilly ends at the next ">" like any other. A tag
+# whose quoted value is never closed is dropped up to the next ">".
+_TAG = re.compile(
+    r"""<(?:!--.*?--\s*>|!\[CDATA\[.*?\]\]>|[!?][^>]*>|(/?)([a-zA-Z][a-zA-Z0-9:-]*)"""
+    r"""[^>"'=]*(?:(?:=\s*"[^"]*"|=\s*'[^']*'|=(?!\s*["'])|["'])[^>"'=]*)*>|/?[a-zA-Z][^>]*>)""",
+    re.DOTALL,
+)
+_SKIPPED_END = {tag: re.compile(rf"</{tag}\s*>", re.IGNORECASE) for tag in SKIPPED_ELEMENTS}
+_SPACES = re.compile(r"[^\S\n]+")
+_LINE_BREAKS = re.compile(r" ?\n[\s]*")
 
 
 def remove_html_tags(text):
     """
-    Remove HTML tags from a string, handling nested tags and preserving text content.
-    
+    Extract the visible text of an HTML document in a single pass.
+
+    Scripts, styles and other non-content elements are skipped with their
+    contents up to their end tag, block-level elements and the title start a
+    new line, entities are decoded and runs of whitespace collapse to a
+    single space or line break.
+
     Args:
     text (str): The input string containing HTML tags
-    
+
     Returns:
-    str: The input string with HTML tags removed
+    str: The text content, one block per line
+    """
+    if not isinstance(text, str):
+        raise TypeError("Input must be a string")
+
+    parts = []
+    position = 0
+    length = len(text)
+    while position < length:
+        match = _TAG.search(text, position)
+        if match is None:
+            parts.append(text[position:])
+            break
+        if match.start() > position:
+            parts.append(text[position:match.start()])
+        position = match.end()
+
+        name = match.group(2)
+        if name is None:
+            continue
+        name = name.lower()
+        if name in BLOCK_ELEMENTS:
+            parts.append("\n")
+        elif not match.group(1) and name in SKIPPED_ELEMENTS and not match.group(0).endswith("/>"):
+            # Without an end tag, only the start tag is dropped rather than
+            # the rest of the document.
+            end = _SKIPPED_END[name].search(text, position)
+            if end:
+                position = end.end()
+
+    content = "".join(parts)
+    if "&" in content:
+        content = html.unescape(content)
+    content = _SPACES.sub(" ", content)
+    return _LINE_BREAKS.sub("\n", content).strip()
+
+
+def split_text(text, max_chars):
+    """
+    Split text into chunks of at most max_chars characters.
+
+    Chunks end at line breaks, so the blocks remove_html_tags emits stay
+    whole; a single line longer than max_chars is cut at the last space
+    before the limit, or hard at the limit when it has none.
+    """
+    chunks = []
+    current = []
+    current_length = 0
+    for line in text.split("\n"):
+        while len(line) > max_chars:
+            cut = line.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            if current:
+                chunks.append("\n".join(current))
+                current, current_length = [], 0
+            chunks.append(line[:cut])
+            line = line[cut:].lstrip()
+        if current and current_length + 1 + len(line) > max_chars:
+            chunks.append("\n".join(current))
+            current, current_length = [], 0
+        if line:
+            current.append(line)
+            current_length += len(line) + (1 if current_length else 0)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class LinkReducer(HTMLParser):
+    """Keep only anchors (href and text) and headings from an HTML document."""
+
+    SKIPPED_TAGS = {"script", "style", "svg", "noscript", "template", "iframe"}
+    HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lines = []
+        self._skip_depth = 0
+        self._href = None
+        self._heading = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif self._skip_depth:
+            return
+        elif tag == "a":
+            href = dict(attrs).get("href") or ""
+            if href and not href.startswith(("#", "javascript:", "mailto:", "tel:")):
+                self._href = href
+                self._text = []
+        elif tag in self.HEADING_TAGS and self._href is None:
+            self._heading = tag
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag == "a" and self._href is not None:
+            text = " ".join("".join(self._text).split())
+            self.lines.append(f'<a href="{self._href}">{text}</a>')
+            self._href = None
+        elif tag == self._heading:
+            text = " ".join("".join(self._text).split())
+            if text:
+                self.lines.append(f"<{tag}>{text}</{tag}>")
+            self._heading = None
+
+    def handle_data(self, d):
+        if not self._skip_depth and (self._href is not None or self._heading is not None):
+            self._text.append(d)
+
+    def get_data(self):
+        return "\n".join(self.lines)
+
+
+def reduce_listing_html(text):
+    """
+    Shrink a listing page to the parts needed to find job URLs.
+
+    Scripts (including JSON blobs), styles, inline SVG and all attributes
+    except href are dropped; what remains is one anchor or heading per line.
     """
     if not isinstance(text, str):
         raise TypeError("Input must be a string")
 
-    # First, use regex to remove script and style elements and their contents
-    text = re.sub(r'(?is)<(script|style).*?>.*?</\1>', '', text)
-    
-    # Then use HTMLParser to handle the remaining HTML
-    stripper = MLStripper()
-    stripper.feed(text)
-    return stripper.get_data()
+    reducer = LinkReducer()
+    reducer.feed(text)
+    reducer.close()
+    return reducer.get_data()
 
 
 def fix_url(url):
@@ -0,0 +1,117 @@
+"""
+Compare remove_html_tags with the HTMLParser-based version it replaced.
+
+Run from the job-scraper directory, passing pages saved from real careers
+sites (e.g. with "Save page as" or page.content()):
+
+    uv run python -m benchmarks.html_to_text benchmarks/pages/*.html --repeat 5
+
+Without paths, a synthetic multi-megabyte careers page is generated.
+"""
+import argparse
+import re
+import statistics
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+
+from app.utils import remove_html_tags
+
+
+class LegacyMLStripper(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.reset()
+        self.strict = False
+        self.convert_charrefs = True
+        self.text = []
+
+    def handle_data(self, d):
+        self.text.append(d)
+
+    def get_data(self):
+        return ''.join(self.text)
+
+
+def legacy_remove_html_tags(text):
+    text = re.sub(r'(?is)<(script|style).*?>.*?</\1>', '', text)
+    stripper = LegacyMLStripper()
+    stripper.feed(text)
+    return stripper.get_data()
+
+
+def synthetic_page(jobs: int = 4000) -> str:
+    script = "<script>window.__DATA__ = {" + ",".join(f'"k{i}": "<div>{i}</div>"' for i in range(2000)) + "};</script>"
+    style = "<style>" + "".join(f".c{i} {{ color: #{i % 999:03d}; }}\n" for i in range(2000)) + "</style>"
+    rows = "".join(
+        f'<li class="job-row" data-id="{i}"><a href="/jobs/{i}" aria-label="Open &quot;role {i}&quot;">'
+        f'<h3>Software Engineer {i}</h3></a><div class="meta"><span>Remote &amp; On-site</span>'
+        f'<span>Lagos, Nigeria</span></div><p>Build   and\n  ship <b>things</b> that matter.</p>'
+        f'<svg viewBox="0 0 10 10"><path d="M0 0L10 10"/></svg></li>\n'
+        for i in range(jobs)
+    )
+    return f"<!DOCTYPE html><html><head><title>Careers</title>{style}</head><body>{script}<ul>{rows}</ul></body></html>"
+
+
+# (document, expected remove_html_tags output), checked before timing.
+CASES = [
+    # </head> is optional in HTML5; the title and body must survive without it.
+    (
+        "<html><head><title>Sr Eng - Acme</title><body><p>Hi &amp; <b>there</b></p>",
+        "Sr Eng - Acme\nHi & there",
+    ),
+    (
+        "<head><meta charset=utf-8><style>p { color: red }</style></head>"
+        "<body><div>Apply<script>track()</script> now</div>",
+        "Apply now",
+    ),
+    # An unclosed non-content element drops its start tag, not the rest of the page.
+    ("<p>Remote</p><iframe src=/x><p>Full time</p>", "Remote\nFull time"),
+    # A quote inside an unquoted attribute value does not start a quoted value.
+    (
+        "<a href=/o'reilly>Link</a> we don't stop <p>here</p>",
+        "Link we don't stop\nhere",
+    ),
+    ('<a title="1 > 0" data-x=it\'s>Apply</a>', "Apply"),
+    ('<a title="unclosed>Apply</a> now', "Apply now"),
+]
+
+
+def check_cases() -> None:
+    for document, expected in CASES:
+        output = remove_html_tags(document)
+        assert output == expected, f"remove_html_tags({document!r}) returned {output!r}, expected {expected!r}"
+
+
+def measure(function, document: str, repeat: int) -> tuple:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = function(document)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), output
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pages", nargs="*", type=Path, help="captured HTML pages")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    check_cases()
+
+    documents = [(path.name, path.read_text(encoding="utf-8", errors="replace")) for path in args.pages]
+    if not documents:
+        documents = [("synthetic", synthetic_page())]
+
+    print(f"{'page':<24} {'size KB':>8} {'legacy ms':>10} {'new ms':>8} {'speedup':>8} {'legacy out KB':>14} {'new out KB':>11}")
+    for name, document in documents:
+        legacy_time, legacy_output = measure(legacy_remove_html_tags, document, args.repeat)
+        new_time, new_output = measure(remove_html_tags, document, args.repeat)
+        print(
+            f"{name[:24]:<24} {len(document) / 1024:>8.0f} {legacy_time * 1000:>10.1f} {new_time * 1000:>8.1f} "
+            f"{legacy_time / new_time:>7.1f}x {len(legacy_output) / 1024:>14.0f} {len(new_output) / 1024:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,73 @@
+import json
+
 import requests
 import gradio as gr
 
 # Point this at your running FastAPI server
-API_URL = "http://localhost:8000/jobs/"
+STREAM_URL = "http://localhost:8000/jobs/stream/"
+
+
+def _job_row(job: dict) -> list:
+    desc = job.get("job_description") or ""
+    preview = (desc[:300] + "...") if desc else "—"
+    return [
+        job.get("job_title") or "—",
+        job.get("company_name") or "—",
+        preview,
+        job.get("apply_url") or "—",
+    ]
 
 
 def scrape_jobs(url: str):
+    """Stream jobs from the API, yielding (status, rows) as each one arrives."""
     if not url.strip():
-        return "Please enter a URL.", None
+        yield "Please enter a URL.", None
+        return
+
+    yield "Scraping careers page...", None
 
+    rows = []
     try:
-        response = requests.post(API_URL, json={"url": url.strip()})
-        response.raise_for_status()
+        with requests.post(STREAM_URL, json={"url": url.strip()}, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+                kind = event.get("event")
+
+                if kind == "error":
+                    yield event.get("message", "No jobs found."), None
+                    return
+                if kind == "pages_scraped":
+                    count = event["count"]
+                    yield f"Scraped {count} listing page{'s' if count != 1 else ''}. Looking for jobs...", None
+                elif kind == "urls_discovered":
+                    count = event["count"]
+                    yield f"Found {count} job URL{'s' if count != 1 else ''}. Extracting...", None
+                elif kind == "job" and isinstance(event.get("data"), dict):
+                    rows.append(_job_row(event["data"]))
+                    yield f"Extracted {event['processed']} of {event['total']} jobs...", list(rows)
+                elif kind == "skipped":
+                    yield f"Extracted {event['processed']} of {event['total']} jobs...", list(rows) or None
     except requests.exceptions.ConnectionError:
-        return "Could not connect to the API. Make sure the FastAPI server is running on http://localhost:8000.", None
+        yield "Could not connect to the API. Make sure the FastAPI server is running on http://localhost:8000.", rows or None
+        return
     except requests.exceptions.Timeout:
-        return "Request timed out. The page may have too many listings.", None
+        yield "Request timed out. The page may have too many listings.", rows or None
+        return
     except requests.exceptions.HTTPError as e:
-        return f"API error: {e.response.status_code} — {e.response.text}", None
-
-    data = response.json()
-
-    if not isinstance(data, dict):
-        return (
-            f"Unexpected API response (expected a JSON object). Got {type(data).__name__}.",
-            None,
-        )
-
-    if data.get("status") == 400:
-        return data.get("message", "No jobs found."), None
-
-    jobs = data.get("data") or []
-    if not isinstance(jobs, list):
-        jobs = []
-
-    if not jobs:
-        return "No job listings found on that page.", None
-
-    rows = []
-    for job in jobs:
-        if not isinstance(job, dict):
-            continue
-        desc = job.get("job_description") or ""
-        preview = (desc[:300] + "...") if desc else "—"
-        rows.append([
-            job.get("job_title") or "—",
-            job.get("company_name") or "—",
-            preview,
-            job.get("apply_url") or "—",
-        ])
+        yield f"API error: {e.response.status_code} — {e.response.text}", None
+        return
+    except ValueError:
+        yield "Unexpected API response (expected newline-delimited JSON).", rows or None
+        return
 
     if not rows:
-        return "No job listings found on that page.", None
+        yield "No job listings found on that page.", None
+        return
 
-    status_msg = f"Found {len(rows)} job listing{'s' if len(rows) != 1 else ''}."
-    return status_msg, rows
+    yield f"Found {len(rows)} job listing{'s' if len(rows) != 1 else ''}.", rows
 
 
 with gr.Blocks(
@@ -0,0 +1,45 @@
+import asyncio
+
+from app import fetcher
+
+
+JOB_PAGE = "<p>" + "Senior engineer. " * 40 + "</p>"
+
+
+def fetch_all(monkeypatch, responses, urls, max_failures=3):
+    async def scrape_webpage(url):
+        return ["<html>rendered</html>"]
+
+    monkeypatch.setattr(fetcher, "scrape_webpage", scrape_webpage)
+    page_fetcher = fetcher.PageFetcher(max_failures=max_failures)
+    responses = iter(responses)
+
+    async def get(url):
+        return next(responses)
+
+    page_fetcher._get = get
+
+    async def run():
+        for url in urls:
+            await page_fetcher.fetch(url)
+
+    asyncio.run(run())
+    return page_fetcher.stats()["domains"]
+
+
+def test_network_errors_do_not_pin_a_domain_to_the_browser(monkeypatch):
+    urls = [f"https://jobs.example.com/{number}" for number in range(4)]
+    responses = [(None, None), (None, None), (None, None), (200, JOB_PAGE)]
+    assert fetch_all(monkeypatch, responses, urls) == {"jobs.example.com": fetcher.HTTP}
+
+
+def test_error_responses_in_a_row_switch_a_domain_to_the_browser(monkeypatch):
+    urls = [f"https://jobs.example.com/{number}" for number in range(3)]
+    assert fetch_all(monkeypatch, [(503, None)] * 2, urls[:2]) == {}
+    assert fetch_all(monkeypatch, [(503, None)] * 3, urls) == {"jobs.example.com": fetcher.BROWSER}
+
+
+def test_page_without_job_content_switches_a_domain_to_the_browser(monkeypatch):
+    responses = [(200, '<div id="root"></div>')]
+    urls = ["https://jobs.example.com/1", "https://jobs.example.com/2"]
+    assert fetch_all(monkeypatch, responses, urls) == {"jobs.example.com": fetcher.BROWSER}
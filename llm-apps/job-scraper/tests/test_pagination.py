@@ -0,0 +1,62 @@
+from app.pagination import find_page_urls
+
+
+LISTING = "https://careers.example.com/jobs"
+
+
+def pager(numbers, next_page=None):
+    links = "".join(f'<a href="?page={number}">{number}</a>' for number in numbers)
+    if next_page is not None:
+        links += f'<a href="?page={next_page}" rel="next">Next</a>'
+    return f"<nav>{links}</nav>"
+
+
+def page_url(number):
+    return f"{LISTING}?page={number}"
+
+
+def follow(pages, max_pages=20):
+    """Discover pages the way the scrapers do: from page 1, then from the last page loaded."""
+    loaded = [LISTING]
+    page_urls = find_page_urls(pages[LISTING], LISTING, max_pages)
+    while page_urls and len(loaded) < max_pages:
+        pending = [url for url in page_urls if url not in loaded][:max_pages - len(loaded)]
+        if not pending:
+            break
+        loaded.extend(pending)
+        page_urls = find_page_urls(pages[pending[-1]], pending[-1], max_pages)
+    return loaded
+
+
+def test_windowed_pager_is_followed_past_the_window():
+    last = 40
+    pages = {LISTING: pager(range(1, 6), next_page=2)}
+    for number in range(2, last + 1):
+        window = range(max(1, number - 2), min(last, number + 2) + 1)
+        pages[page_url(number)] = pager(window, next_page=number + 1 if number < last else None)
+
+    assert find_page_urls(pages[LISTING], LISTING) == [page_url(number) for number in range(2, 6)]
+    assert follow(pages) == [LISTING] + [page_url(number) for number in range(2, 21)]
+    assert follow(pages, max_pages=50) == [LISTING] + [page_url(number) for number in range(2, last + 1)]
+
+
+def test_next_only_pager_never_reloads_the_first_page():
+    pages = {LISTING: '<a href="?page=2">Next ›</a>'}
+    for number in range(2, 5):
+        links = f'<a href="?page={number - 1}">‹ Previous</a>'
+        if number < 4:
+            links += f'<a href="?page={number + 1}">Next ›</a>'
+        pages[page_url(number)] = links
+
+    assert find_page_urls(pages[LISTING], LISTING) == [page_url(2)]
+    assert follow(pages) == [LISTING, page_url(2), page_url(3), page_url(4)]
+
+
+def test_zero_based_pages_are_read_from_labels():
+    document = '<a href="?page=1">2</a><a href="?page=2">3</a>'
+    assert find_page_urls(document, LISTING) == [page_url(1), page_url(2)]
+
+
+def test_link_to_the_current_page_is_not_returned():
+    assert find_page_urls(pager(range(1, 4)), LISTING) == [page_url(2), page_url(3)]
+    assert find_page_urls(pager(range(1, 4)), page_url(3)) == []
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from decouple import config
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .crud import add_quiz
+from .database import async_engine
+from .prompts import generate_quizzes
+from .schemas import QuizBatchItem, QuizSchema
+from .stats import invalidate_stats
+from .topic_cache import topic_cache
+
+
+logger = logging.getLogger(__name__)
+
+# Topic content and quiz generation each get their own pool, so content for
+# later items is written while earlier items are being turned into quizzes.
+CONTENT_CONCURRENCY = config("QUIZ_GENERATOR_BATCH_CONTENT_CONCURRENCY", default=4, cast=int)
+QUIZ_CONCURRENCY = config("QUIZ_GENERATOR_BATCH_QUIZ_CONCURRENCY", default=4, cast=int)
+MAX_BATCH_ITEMS = config("QUIZ_GENERATOR_BATCH_MAX_ITEMS", default=100, cast=int)
+# Most quizzes saved in one transaction.
+WRITE_SIZE = config("QUIZ_GENERATOR_BATCH_WRITE_SIZE", default=20, cast=int)
+# Seconds a finished batch stays available for progress polling.
+RETENTION = config("QUIZ_GENERATOR_BATCH_RETENTION", default=3600, cast=float)
+
+PENDING = "pending"
+GENERATING_CONTENT = "generating_content"
+GENERATING_QUIZ = "generating_quiz"
+SAVED = "saved"
+FAILED = "failed"
+
+
+class BatchEntry:
+    def __init__(self, index: int, item: QuizBatchItem):
+        self.index = index
+        self.mode = item.mode
+        self.topic = item.topic.strip() if item.mode == "topic" else None
+        self.content = item.content.strip() if item.mode == "paste" else ""
+        self.status = PENDING
+        self.quiz_id: Optional[int] = None
+        self.error: Optional[str] = None
+
+
+class QuizBatch:
+    """A set of quizzes being generated in the background."""
+
+    def __init__(self, items: List[QuizBatchItem], number_of_questions: int, number_of_options: int):
+        self.id = uuid.uuid4().hex
+        self.number_of_questions = number_of_questions
+        self.number_of_options = number_of_options
+        self.entries = [BatchEntry(index, item) for index, item in enumerate(items)]
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def progress(self) -> dict:
+        counts = {status: 0 for status in (PENDING, GENERATING_CONTENT, GENERATING_QUIZ, SAVED, FAILED)}
+        for entry in self.entries:
+            counts[entry.status] += 1
+        return {
+            "id": self.id,
+            "status": "completed" if self.done else "running",
+            "total": len(self.entries),
+            "saved": counts[SAVED],
+            "failed": counts[FAILED],
+            "in_progress": counts[GENERATING_CONTENT] + counts[GENERATING_QUIZ],
+            "pending": counts[PENDING],
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "items": [
+                {
+                    "index": entry.index,
+                    "mode": entry.mode,
+                    "topic": entry.topic,
+                    "status": entry.status,
+                    "quiz_id": entry.quiz_id,
+                    "error": entry.error,
+                }
+                for entry in self.entries
+            ],
+        }
+
+
+_batches: Dict[str, QuizBatch] = {}
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+def get_batch(batch_id: str) -> Optional[QuizBatch]:
+    return _batches.get(batch_id)
+
+
+async def _save_quizzes(batch: QuizBatch, generated: List[Tuple[BatchEntry, QuizSchema]]) -> None:
+    async with AsyncSession(async_engine) as session:
+        quiz_ids = []
+        for entry, quiz_data in generated:
+            quiz = await session.run_sync(
+                add_quiz,
+                topic=entry.topic,
+                content=entry.content,
+                number_of_questions=batch.number_of_questions,
+                number_of_options=batch.number_of_options,
+                quiz_data=quiz_data,
+            )
+            quiz_ids.append(quiz.id)
+        await session.commit()
+    invalidate_stats()
+    for (entry, _), quiz_id in zip(generated, quiz_ids):
+        entry.quiz_id = quiz_id
+        entry.status = SAVED
+
+
+async def _generate(
+    batch: QuizBatch,
+    entry: BatchEntry,
+    content_semaphore: asyncio.Semaphore,
+    quiz_semaphore: asyncio.Semaphore,
+    generated: asyncio.Queue,
+) -> None:
+    try:
+        if entry.mode == "topic":
+            async with content_semaphore:
+                entry.status = GENERATING_CONTENT
+                entry.content = await topic_cache.get_content(entry.topic)
+        async with quiz_semaphore:
+            entry.status = GENERATING_QUIZ
+            quiz_data = await generate_quizzes(
+                number_of_questions=batch.number_of_questions,
+                number_of_options=batch.number_of_options,
+                text=entry.content
+            )
+    except asyncio.TimeoutError:
+        entry.status = FAILED
+        entry.error = "Generation timed out"
+        return
+    except Exception as e:
+        logger.exception("Batch %s item %s failed", batch.id, entry.index)
+        entry.status = FAILED
+        entry.error = str(e)
+        return
+    await generated.put((entry, quiz_data[0]))
+
+
+async def _write(batch: QuizBatch, generated: asyncio.Queue) -> None:
+    """Save generated quizzes as they arrive, up to WRITE_SIZE per transaction."""
+    while True:
+        first = await generated.get()
+        if first is None:
+            return
+        group = [first]
+        finished = False
+        while len(group) < WRITE_SIZE and not generated.empty():
+            item = generated.get_nowait()
+            if item is None:
+                finished = True
+                break
+            group.append(item)
+        try:
+            await _save_quizzes(batch, group)
+        except Exception as e:
+            logger.exception("Saving %s quizzes of batch %s failed", len(group), batch.id)
+            for entry, _ in group:
+                entry.status = FAILED
+                entry.error = str(e)
+        if finished:
+            return
+
+
+async def _run(batch: QuizBatch) -> None:
+    content_semaphore = asyncio.Semaphore(CONTENT_CONCURRENCY)
+    quiz_semaphore = asyncio.Semaphore(QUIZ_CONCURRENCY)
+    generated: asyncio.Queue = asyncio.Queue()
+    writer = asyncio.create_task(_write(batch, generated))
+    try:
+        await asyncio.gather(*[
+            _generate(batch, entry, content_semaphore, quiz_semaphore, generated)
+            for entry in batch.entries
+        ])
+        await generated.put(None)
+        await writer
+    finally:
+        writer.cancel()
+        batch.finished_at = time.time()
+        _tasks.pop(batch.id, None)
+
+
+def _prune() -> None:
+    cutoff = time.time() - RETENTION
+    for batch_id, batch in list(_batches.items()):
+        if batch.done and batch.finished_at < cutoff:
+            del _batches[batch_id]
+
+
+def start_batch(items: List[QuizBatchItem], number_of_questions: int, number_of_options: int) -> QuizBatch:
+    """
+    Generate a quiz for every item in the background.
+
+    Progress is kept in memory for RETENTION seconds after the batch finishes;
+    quizzes are saved as they are generated, up to WRITE_SIZE per transaction.
+    """
+    _prune()
+    batch = QuizBatch(items, number_of_questions, number_of_options)
+    _batches[batch.id] = batch
+    _tasks[batch.id] = asyncio.create_task(_run(batch))
+    return batch
@@ -0,0 +1,69 @@
+import asyncio
+import functools
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+import boto3
+from botocore.config import Config
+from decouple import config
+
+
+T = TypeVar("T")
+
+BEDROCK_MAX_CONNECTIONS = config("BEDROCK_MAX_CONNECTIONS", default=50, cast=int)
+BEDROCK_MAX_WORKERS = config("BEDROCK_MAX_WORKERS", default=8, cast=int)
+BEDROCK_TIMEOUT = config("BEDROCK_TIMEOUT", default=120, cast=float)
+
+# boto3 has no async API, so blocking calls run here instead of on the event loop.
+_executor = ThreadPoolExecutor(max_workers=BEDROCK_MAX_WORKERS, thread_name_prefix="bedrock")
+
+
+def shared_instance(factory: Callable[[], T]) -> Callable[[], T]:
+    """Build factory() on first use and hand the same object to every caller and thread."""
+    lock = threading.Lock()
+    instance = []
+
+    @functools.wraps(factory)
+    def get() -> T:
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    return get
+
+
+@shared_instance
+def get_bedrock_client():
+    return boto3.client(
+        "bedrock-runtime",
+        region_name=config("AWS_REGION_NAME"),
+        aws_access_key_id=config("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=config("AWS_SECRET_ACCESS_KEY"),
+        config=Config(max_pool_connections=BEDROCK_MAX_CONNECTIONS, read_timeout=BEDROCK_TIMEOUT),
+    )
+
+
+async def converse(timeout: float = BEDROCK_TIMEOUT, **kwargs) -> dict:
+    """
+    Call the Bedrock converse API without blocking the event loop.
+
+    Raises asyncio.TimeoutError if no response arrives within timeout seconds.
+    """
+    loop = asyncio.get_running_loop()
+    call = loop.run_in_executor(_executor, functools.partial(get_bedrock_client().converse, **kwargs))
+    return await asyncio.wait_for(call, timeout)
+
+
+async def invoke_model(timeout: float = BEDROCK_TIMEOUT, **kwargs) -> dict:
+    """Call the Bedrock invoke_model API off the event loop and decode its JSON body."""
+    loop = asyncio.get_running_loop()
+
+    def call() -> dict:
+        response = get_bedrock_client().invoke_model(**kwargs)
+        return json.loads(response["body"].read())
+
+    return await asyncio.wait_for(loop.run_in_executor(_executor, call), timeout)
@@ -0,0 +1,132 @@
+import base64
+import binascii
+import json
+from typing import List, Optional, Tuple
+
+from decouple import config
+from sqlalchemy import func, insert
+from sqlalchemy.orm import defer
+from sqlmodel import Session, select
+
+from . import models
+from .schemas import QuizSchema, QuizSummaryResponse
+
+
+PAGE_SIZE = config("QUIZ_GENERATOR_PAGE_SIZE", default=24, cast=int)
+MAX_PAGE_SIZE = 100
+PREVIEW_LENGTH = 300
+
+
+def is_all_caps(s: str) -> bool:
+    alpha_chars = [c for c in s if c.isalpha()]
+    return len(alpha_chars) > 0 and all(c.isupper() for c in alpha_chars)
+
+
+def add_quiz(
+    session: Session,
+    topic: Optional[str],
+    content: str,
+    number_of_questions: int,
+    number_of_options: int,
+    quiz_data: QuizSchema,
+) -> models.Quiz:
+    """
+    Insert a generated quiz with its questions and options.
+
+    Nothing is committed, so the caller decides the transaction. Questions and
+    options are inserted as one executemany each instead of a statement per
+    row, which keeps the cost flat as quizzes grow.
+    """
+    quiz = models.Quiz(
+        topic=topic,
+        content=content,
+        number_of_questions=number_of_questions,
+        number_of_options=number_of_options
+    )
+    session.add(quiz)
+    session.flush()
+    if not quiz_data.questions:
+        return quiz
+
+    session.execute(
+        insert(models.Question),
+        [{"quiz_id": quiz.id, "question": question_text} for question_text in quiz_data.questions],
+    )
+    # Question texts are the keys of quiz_data, so they are unique within a quiz.
+    question_ids = dict(session.execute(
+        select(models.Question.question, models.Question.id).where(models.Question.quiz_id == quiz.id)
+    ).all())
+
+    option_rows = []
+    for question_text, options_list in quiz_data.questions.items():
+        # The one correct answer is the only option written in ALL CAPS; if
+        # none or several are, no option is marked correct.
+        caps_options = [o for o in options_list if is_all_caps(o)]
+        correct_option = caps_options[0] if len(caps_options) == 1 else None
+        option_rows.extend(
+            {
+                "question_id": question_ids[question_text],
+                "option": option_text.lower(),
+                "is_correct": correct_option is not None and option_text == correct_option,
+            }
+            for option_text in options_list
+        )
+    if option_rows:
+        session.execute(insert(models.Option), option_rows)
+    return quiz
+
+
+def delete_quiz_by_id(session: Session, quiz_id: int) -> bool:
+    """Delete a quiz without loading its content. Returns False if it does not exist."""
+    quiz = session.get(models.Quiz, quiz_id, options=[defer(models.Quiz.content)])
+    if quiz is None:
+        return False
+    session.delete(quiz)
+    return True
+
+
+def encode_cursor(quiz_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": quiz_id}).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Return the quiz id in a cursor token; raises ValueError if the token is malformed."""
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["id"])
+    except (TypeError, KeyError, UnicodeDecodeError, json.JSONDecodeError, binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def list_quiz_summaries(
+    session: Session, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[QuizSummaryResponse], Optional[str]]:
+    """
+    One page of quizzes, newest first, and the cursor for the next page.
+
+    Only the listed columns and a prefix of the content are read; questions
+    are counted in SQL rather than loaded. Pages are keyed on the last id
+    seen, so deep pages cost the same as the first.
+    """
+    question_count = (
+        select(func.count(models.Question.id))
+        .where(models.Question.quiz_id == models.Quiz.id)
+        .scalar_subquery()
+    )
+    statement = (
+        select(
+            models.Quiz.id,
+            models.Quiz.topic,
+            func.substr(models.Quiz.content, 1, PREVIEW_LENGTH).label("preview"),
+            question_count.label("question_count"),
+            models.Quiz.number_of_options,
+        )
+        .order_by(models.Quiz.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        statement = statement.where(models.Quiz.id < decode_cursor(cursor))
+    rows = session.exec(statement).all()
+
+    quizzes = [QuizSummaryResponse.model_validate(row._mapping) for row in rows[:limit]]
+    next_cursor = encode_cursor(quizzes[-1].id) if len(rows) > limit else None
+    return quizzes, next_cursor
@@ -1,13 +1,63 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import create_engine, Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from decouple import config
 
 
 sqlite_file_name = config("QUIZ_GENERATOR_SQLITE_FILE_NAME")
 sqlite_url = f"sqlite:///{sqlite_file_name}"
+async_sqlite_url = f"sqlite+aiosqlite:///{sqlite_file_name}"
+
+# Performance profile, applied to every new connection. The defaults suit a
+# single-host deployment with several concurrent requests: WAL lets reads run
+# alongside a write, and busy_timeout makes writers wait instead of failing
+# with "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": config("QUIZ_GENERATOR_SQLITE_JOURNAL_MODE", default="WAL"),
+    "synchronous": config("QUIZ_GENERATOR_SQLITE_SYNCHRONOUS", default="NORMAL"),
+    "mmap_size": config("QUIZ_GENERATOR_SQLITE_MMAP_SIZE", default=256 * 1024 * 1024, cast=int),
+    # Negative values are KiB rather than pages.
+    "cache_size": config("QUIZ_GENERATOR_SQLITE_CACHE_SIZE", default=-64000, cast=int),
+    "busy_timeout": config("QUIZ_GENERATOR_SQLITE_BUSY_TIMEOUT", default=5000, cast=int),
+}
 
 connect_args = {"check_same_thread": False}
-engine = create_engine(sqlite_url, echo=True)
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def _engine_options() -> dict:
+    return dict(
+        echo=config("QUIZ_GENERATOR_SQLITE_ECHO", default=False, cast=bool),
+        pool_size=config("QUIZ_GENERATOR_DB_POOL_SIZE", default=10, cast=int),
+        max_overflow=config("QUIZ_GENERATOR_DB_MAX_OVERFLOW", default=20, cast=int),
+        pool_timeout=config("QUIZ_GENERATOR_DB_POOL_TIMEOUT", default=30, cast=float),
+    )
+
+
+def build_engine(url: str) -> Engine:
+    new_engine = create_engine(url, connect_args=connect_args, **_engine_options())
+    event.listen(new_engine, "connect", set_sqlite_pragmas)
+    return new_engine
+
+
+def build_async_engine(url: str) -> AsyncEngine:
+    """The same profile over aiosqlite, so queries run off the event loop."""
+    new_engine = create_async_engine(url, **_engine_options())
+    event.listen(new_engine.sync_engine, "connect", set_sqlite_pragmas)
+    return new_engine
+
+
+engine = build_engine(sqlite_url)
+async_engine = build_async_engine(async_sqlite_url)
 
 
 def create_db_and_tables():
@@ -19,6 +69,6 @@ def get_session():
         yield session
 
 
-
-   
- 
\ No newline at end of file
+async def get_async_session():
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
@@ -1,19 +1,27 @@
-from typing import Annotated
+import asyncio
+from typing import Annotated, Optional
 from datetime import timedelta
 
-from fastapi import FastAPI, Depends, status, HTTPException, Form, Request
+from fastapi import FastAPI, Depends, status, HTTPException, Form, Query, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import selectinload
 from starlette.templating import Jinja2Templates
 
 from . import models
-from .database import create_db_and_tables, get_session
+from .batches import MAX_BATCH_ITEMS, get_batch, start_batch
+from .clients import get_bedrock_client
+from .crud import MAX_PAGE_SIZE, PAGE_SIZE, add_quiz, delete_quiz_by_id, list_quiz_summaries
+from .database import create_db_and_tables, get_async_session, get_session
 from .security import generate_hashed_password, verify_hashed_password, manager, OAuth2PasswordNewRequestForm
-from .prompts import generate_quizzes, generate_content_from_topic
-from .schemas import QuizDetailResponse, QuizListResponse
+from .prompts import generate_quizzes
+from .topic_cache import topic_cache
+from .stats import get_stats, invalidate_stats
+from .schemas import QuizBatchRequest, QuizDetailResponse, QuizListResponse
 
 SessionDep = Annotated[Session, Depends(get_session)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
 
 app = FastAPI()
 templates = Jinja2Templates(directory="app/templates")
@@ -22,26 +30,45 @@ templates = Jinja2Templates(directory="app/templates")
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables()
+    get_bedrock_client()
 
 
 @app.get("/", response_class=HTMLResponse)
-async def home(request: Request, session: SessionDep):
-    total_quizzes = len(session.exec(select(models.Quiz)).all())
-    total_questions = len(session.exec(select(models.Question)).all())
-    return templates.TemplateResponse(request, "home.html", {
-        "total_quizzes": total_quizzes,
-        "total_questions": total_questions,
-    })
+async def home(request: Request, session: AsyncSessionDep):
+    return templates.TemplateResponse(request, "home.html", await session.run_sync(get_stats))
+
+
+@app.get("/stats/")
+async def stats(session: AsyncSessionDep):
+    return {**await session.run_sync(get_stats), "topic_cache": topic_cache.stats()}
 
 
 @app.get("/quizzes", response_class=HTMLResponse)
-async def list_quizzes_page(request: Request, session: SessionDep):
-    statement = (
-        select(models.Quiz)
-        .options(selectinload(models.Quiz.questions).selectinload(models.Question.options))
-    )
-    quizzes = session.exec(statement).all()
-    return templates.TemplateResponse(request, "list_quizzes.html", {"quizzes": quizzes})
+async def list_quizzes_page(request: Request, session: AsyncSessionDep, cursor: Optional[str] = None):
+    quiz_list = await _list_quizzes(session, cursor, PAGE_SIZE)
+    return templates.TemplateResponse(request, "list_quizzes.html", {
+        "quizzes": quiz_list.quizzes,
+        "total": quiz_list.total,
+        "next_cursor": quiz_list.next_cursor,
+        "is_first_page": cursor is None,
+    })
+
+
+@app.get("/api/quizzes/", response_model=QuizListResponse)
+async def list_quizzes(
+    session: AsyncSessionDep, cursor: Optional[str] = None, limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """Quiz summaries, newest first. Pass next_cursor back as cursor for the next page."""
+    return await _list_quizzes(session, cursor, limit)
+
+
+async def _list_quizzes(session: AsyncSession, cursor: Optional[str], limit: int) -> QuizListResponse:
+    try:
+        quizzes, next_cursor = await session.run_sync(list_quiz_summaries, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    stats = await session.run_sync(get_stats)
+    return QuizListResponse(quizzes=quizzes, total=stats["total_quizzes"], next_cursor=next_cursor)
 
 
 @app.get("/quizzes/new", response_class=HTMLResponse)
@@ -51,7 +78,7 @@ async def create_quiz_page(request: Request):
 
 @app.post("/quizzes/")
 async def create_quiz(
-    request: Request, session: SessionDep,
+    request: Request, session: AsyncSessionDep,
     mode: str = Form(...),           # "paste" or "topic"
     content: str = Form(default=""),
     topic: str = Form(default=""),
@@ -62,7 +89,10 @@ async def create_quiz(
     if mode == "topic":
         if not topic.strip():
             raise HTTPException(status_code=400, detail="Topic is required")
-        generated_content = await generate_content_from_topic(topic.strip())
+        try:
+            generated_content = await topic_cache.get_content(topic.strip())
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Content generation timed out")
         final_content = generated_content
         final_topic = topic.strip()
     else:
@@ -71,72 +101,84 @@ async def create_quiz(
         final_content = content.strip()
         final_topic = None
 
-    quiz = models.Quiz(
+    # Generate before saving anything, so a timed-out generation leaves no empty quiz behind
+    try:
+        quiz_data = await generate_quizzes(
+            number_of_questions=number_of_questions,
+            number_of_options=number_of_options,
+            text=final_content
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Quiz generation timed out")
+    quiz_data = quiz_data[0]
+
+    # One transaction for the quiz, its questions and their options.
+    quiz = await session.run_sync(
+        add_quiz,
         topic=final_topic,
         content=final_content,
-        number_of_questions=number_of_questions,
-        number_of_options=number_of_options
-    )
-    session.add(quiz)
-    session.commit()
-    session.refresh(quiz)
-
-    quiz_data = await generate_quizzes(
         number_of_questions=number_of_questions,
         number_of_options=number_of_options,
-        text=final_content
+        quiz_data=quiz_data
     )
-    quiz_data = quiz_data[0]
-
-    for question_text, options_list in quiz_data.questions.items():
-        db_question = models.Question(quiz_id=quiz.id, question=question_text)
-        session.add(db_question)
-        session.commit()
-
-        # Find the one correct answer: has alpha chars and ALL alpha chars are uppercase
-        # Fallback: if none or multiple match, pick the first one that looks most uppercase
-        def is_all_caps(s: str) -> bool:
-            alpha_chars = [c for c in s if c.isalpha()]
-            return len(alpha_chars) > 0 and all(c.isupper() for c in alpha_chars)
-
-        caps_options = [o for o in options_list if is_all_caps(o)]
-
-        # If exactly one caps option found, use it; otherwise fall back to first option
-        correct_option = caps_options[0] if len(caps_options) == 1 else None
+    quiz_id = quiz.id
+    await session.commit()
+    invalidate_stats()
+
+    return RedirectResponse(url=f"/quizzes/{quiz_id}", status_code=303)
+
+
+@app.post("/quizzes/batches/", status_code=status.HTTP_202_ACCEPTED)
+async def create_quiz_batch(batch_request: QuizBatchRequest):
+    """
+    Queue a quiz for every pasted content or topic in the request. Poll
+    GET /quizzes/batches/{batch_id} for progress and the ids of saved quizzes.
+    """
+    if not batch_request.items:
+        raise HTTPException(status_code=400, detail="At least one item is required")
+    if len(batch_request.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"A batch can have at most {MAX_BATCH_ITEMS} items")
+    for index, item in enumerate(batch_request.items):
+        if item.mode == "topic" and not item.topic.strip():
+            raise HTTPException(status_code=400, detail=f"Item {index}: topic is required")
+        if item.mode == "paste" and not item.content.strip():
+            raise HTTPException(status_code=400, detail=f"Item {index}: content is required")
+
+    batch = start_batch(
+        batch_request.items,
+        number_of_questions=batch_request.number_of_questions,
+        number_of_options=batch_request.number_of_options
+    )
+    return batch.progress()
 
-        for option_text in options_list:
-            is_correct = (correct_option is not None and option_text == correct_option)
-            db_option = models.Option(
-                question_id=db_question.id,
-                option=option_text.lower(),
-                is_correct=is_correct
-            )
-            session.add(db_option)
-        session.commit()
 
-    return RedirectResponse(url=f"/quizzes/{quiz.id}", status_code=303)
+@app.get("/quizzes/batches/{batch_id}")
+async def quiz_batch_progress(batch_id: str):
+    batch = get_batch(batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch.progress()
 
 
 @app.get("/quizzes/{quiz_id}", response_class=HTMLResponse)
-async def quiz_detail_page(quiz_id: int, request: Request, session: SessionDep):
+async def quiz_detail_page(quiz_id: int, request: Request, session: AsyncSessionDep):
     statement = (
         select(models.Quiz)
         .options(selectinload(models.Quiz.questions).selectinload(models.Question.options))
         .where(models.Quiz.id == quiz_id)
     )
-    quiz = session.exec(statement).first()
+    quiz = (await session.exec(statement)).first()
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     return templates.TemplateResponse(request, "quiz_detail.html", {"quiz": quiz, "topic": quiz.topic})
 
 
 @app.delete("/quizzes/{quiz_id}")
-async def delete_quiz(quiz_id: int, session: SessionDep):
-    quiz = session.get(models.Quiz, quiz_id)
-    if not quiz:
+async def delete_quiz(quiz_id: int, session: AsyncSessionDep):
+    if not await session.run_sync(delete_quiz_by_id, quiz_id):
         raise HTTPException(status_code=404, detail="Quiz not found")
-    session.delete(quiz)
-    session.commit()
+    await session.commit()
+    invalidate_stats()
     return {"ok": True}
 
 
@@ -37,7 +37,7 @@ class Quiz(SQLModel, table=True):
     
 class Question(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
-    quiz_id: int | None = Field(default=None, foreign_key="quiz.id")
+    quiz_id: int | None = Field(default=None, foreign_key="quiz.id", index=True)
     quiz: Quiz = Relationship(back_populates="questions")
     question: str
     
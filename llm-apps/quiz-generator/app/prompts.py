@@ -1,15 +1,16 @@
 import json
-import boto3
+
 from decouple import config
 
+from .clients import BEDROCK_TIMEOUT, converse, get_bedrock_client, invoke_model
+
+
+EMBEDDING_MODEL_ID = config("QUIZ_GENERATOR_EMBEDDING_MODEL_ID", default="amazon.titan-embed-text-v2:0")
+EMBEDDING_DIMENSIONS = config("QUIZ_GENERATOR_EMBEDDING_DIMENSIONS", default=256, cast=int)
+
 
 def get_client():
-    return boto3.client(
-        "bedrock-runtime",
-        region_name=config("AWS_REGION_NAME"),
-        aws_access_key_id=config("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=config("AWS_SECRET_ACCESS_KEY"),
-    )
+    return get_bedrock_client()
 
 
 CONTENT_GENERATION_TEMPLATE = """You are an expert educator. Write a comprehensive, informative piece of content on the following topic.
@@ -51,9 +52,9 @@ Return ONLY the JSON object. No explanation, no markdown, no code blocks.
 """
 
 
-async def generate_content_from_topic(topic: str) -> str:
-    client = get_client()
-    response = client.converse(
+async def generate_content_from_topic(topic: str, timeout: float = BEDROCK_TIMEOUT) -> str:
+    response = await converse(
+        timeout=timeout,
         modelId="us.amazon.nova-lite-v1:0",
         messages=[{
             "role": "user",
@@ -64,13 +65,27 @@ async def generate_content_from_topic(topic: str) -> str:
     return response["output"]["message"]["content"][0]["text"].strip()
 
 
-async def generate_quizzes(number_of_questions: int, number_of_options: int, text: str) -> list:
+async def embed_text(text: str, timeout: float = BEDROCK_TIMEOUT) -> list:
+    """A unit-length Titan embedding of text, so cosine similarity is a dot product."""
+    response = await invoke_model(
+        timeout=timeout,
+        modelId=EMBEDDING_MODEL_ID,
+        contentType="application/json",
+        accept="application/json",
+        body=json.dumps({"inputText": text, "dimensions": EMBEDDING_DIMENSIONS, "normalize": True})
+    )
+    return response["embedding"]
+
+
+async def generate_quizzes(
+    number_of_questions: int, number_of_options: int, text: str, timeout: float = BEDROCK_TIMEOUT
+) -> list:
     from .schemas import QuizSchema
 
-    client = get_client()
     wrong_count = number_of_options - 1
 
-    response = client.converse(
+    response = await converse(
+        timeout=timeout,
         modelId="us.amazon.nova-lite-v1:0",
         messages=[{
             "role": "user",
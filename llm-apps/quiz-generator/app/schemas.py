@@ -1,4 +1,4 @@
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Literal, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -61,9 +61,21 @@ class QuizResponse(BaseModel):
         from_attributes = True
 
 
+class QuizSummaryResponse(BaseModel):
+    id: int
+    topic: Optional[str]
+    preview: str
+    question_count: int
+    number_of_options: int
+
+    class Config:
+        from_attributes = True
+
+
 class QuizListResponse(BaseModel):
-    quizzes: List[QuizResponse]
+    quizzes: List[QuizSummaryResponse]
     total: int
+    next_cursor: Optional[str] = None
     
     class Config:
         from_attributes = True        
@@ -72,3 +84,15 @@ class QuizListResponse(BaseModel):
 class QuizSchema(BaseModel):
     questions: Dict[str, List[str]] = Field(description='Dictionary of questions and their list of options. The key is question and the value is a '
                                                         'List of options')
+
+
+class QuizBatchItem(BaseModel):
+    mode: Literal["paste", "topic"] = "paste"
+    content: str = ""
+    topic: str = ""
+
+
+class QuizBatchRequest(BaseModel):
+    items: List[QuizBatchItem]
+    number_of_questions: int
+    number_of_options: int
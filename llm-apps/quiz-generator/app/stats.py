@@ -0,0 +1,34 @@
+import time
+from typing import Dict, Optional
+
+from decouple import config
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from . import models
+
+
+# Seconds before cached counts are recomputed even without a create or
+# delete in this process, e.g. after another worker wrote to the database.
+STATS_TTL = config("QUIZ_GENERATOR_STATS_TTL", default=60, cast=float)
+
+_cached: Optional[Dict[str, int]] = None
+_cached_at = 0.0
+
+
+def invalidate_stats() -> None:
+    """Drop the cached counts; call after quizzes are created or deleted."""
+    global _cached
+    _cached = None
+
+
+def get_stats(session: Session) -> Dict[str, int]:
+    """Total quizzes and questions, counted in SQL and cached for STATS_TTL seconds."""
+    global _cached, _cached_at
+    if _cached is None or time.monotonic() - _cached_at > STATS_TTL:
+        _cached = {
+            "total_quizzes": session.exec(select(func.count()).select_from(models.Quiz)).one(),
+            "total_questions": session.exec(select(func.count()).select_from(models.Question)).one(),
+        }
+        _cached_at = time.monotonic()
+    return dict(_cached)
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from decouple import config
+
+from . import prompts
+
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def normalize_topic(topic: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", topic.lower()).split())
+
+
+class CacheEntry:
+    def __init__(self, content: str, embedding: Optional[List[float]], created_at: Optional[float] = None):
+        self.content = content
+        self.embedding = embedding
+        self.created_at = time.monotonic() if created_at is None else created_at
+
+
+class TopicContentCache:
+    """
+    In-memory cache of content generated for quiz topics.
+
+    A topic is looked up by its normalized text first, then by the cosine
+    similarity of its embedding to every cached topic. Entries expire after
+    ttl seconds and the least recently used ones are evicted past
+    max_entries. Embeddings are unit length, so the index is a plain scan of
+    dot products, run in a worker thread over a snapshot of the entries.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, similarity_threshold: float, enabled: bool = True):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._exact_hits = 0
+        self._similar_hits = 0
+        self._misses = 0
+
+    def _expired(self, entry: CacheEntry) -> bool:
+        return time.monotonic() - entry.created_at > self.ttl
+
+    def get_exact(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry.content
+
+    @staticmethod
+    def _best_match(
+        embedding: List[float], candidates: List[Tuple[str, List[float]]], threshold: float
+    ) -> Optional[Tuple[str, float]]:
+        best_key, best_score = None, threshold
+        for key, candidate in candidates:
+            score = math.sumprod(embedding, candidate)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return None if best_key is None else (best_key, best_score)
+
+    async def get_similar(self, embedding: List[float]) -> Optional[Tuple[str, float]]:
+        """The cached topic most similar to embedding, if it clears the threshold."""
+        candidates = []
+        for key, entry in list(self._entries.items()):
+            if self._expired(entry):
+                del self._entries[key]
+            elif entry.embedding is not None:
+                candidates.append((key, entry.embedding))
+        if not candidates:
+            return None
+        match = await asyncio.to_thread(self._best_match, embedding, candidates, self.similarity_threshold)
+        # The entry may have been evicted while the scan ran.
+        if match is None or match[0] not in self._entries:
+            return None
+        self._entries.move_to_end(match[0])
+        return match
+
+    def put(self, key: str, content: str, embedding: Optional[List[float]], created_at: Optional[float] = None) -> None:
+        self._entries[key] = CacheEntry(content, embedding, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _lookup_or_generate(self, key: str, topic: str) -> str:
+        try:
+            embedding = await prompts.embed_text(topic)
+        except Exception:
+            logger.exception("Embedding topic %r failed; generating without the similarity lookup", topic)
+            embedding = None
+
+        if embedding is not None:
+            match = await self.get_similar(embedding)
+            if match is not None:
+                similar_key, score = match
+                logger.info("Topic %r served from cached topic %r (similarity %.3f)", topic, similar_key, score)
+                self._similar_hits += 1
+                similar = self._entries[similar_key]
+                # Remember the new wording too, so it is an exact hit next time.
+                # It keeps the original's age, so chains of similar topics
+                # cannot keep generated content alive past the TTL.
+                self.put(key, similar.content, embedding, created_at=similar.created_at)
+                return similar.content
+
+        self._misses += 1
+        content = await prompts.generate_content_from_topic(topic)
+        self.put(key, content, embedding)
+        return content
+
+    async def get_content(self, topic: str) -> str:
+        """Content for topic, from the cache when an equal or similar topic was seen before."""
+        if not self.enabled:
+            return await prompts.generate_content_from_topic(topic)
+
+        key = normalize_topic(topic)
+        content = self.get_exact(key)
+        if content is not None:
+            self._exact_hits += 1
+            return content
+
+        # Concurrent requests for the same topic share one generation.
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._lookup_or_generate(key, topic))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        lookups = self._exact_hits + self._similar_hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "exact_hits": self._exact_hits,
+            "similar_hits": self._similar_hits,
+            "misses": self._misses,
+            "hit_rate": (self._exact_hits + self._similar_hits) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+        }
+
+
+topic_cache = TopicContentCache(
+    ttl=config("QUIZ_GENERATOR_TOPIC_CACHE_TTL", default=7 * 24 * 60 * 60, cast=float),
+    max_entries=config("QUIZ_GENERATOR_TOPIC_CACHE_MAX_ENTRIES", default=2000, cast=int),
+    similarity_threshold=config("QUIZ_GENERATOR_TOPIC_CACHE_SIMILARITY", default=0.9, cast=float),
+    enabled=config("QUIZ_GENERATOR_TOPIC_CACHE_ENABLED", default=True, cast=bool),
+)
@@ -0,0 +1,188 @@
+"""
+Load test: page reads while quizzes are being generated and saved.
+
+Run from the quiz-generator directory:
+
+    uv run python -m benchmarks.async_load --rate 50 --writers 8 --duration 10
+
+Each variant is served by its own uvicorn process. "sync" runs the list page
+and create_quiz on the blocking Session inside async handlers, as the app did
+before; "async" is the app's own routes on AsyncSession. Quiz generation is
+replaced by a sleep of --llm-latency seconds, so only the database side
+differs. Page reads are started at a fixed --rate and timed from when they
+were due, so a blocked event loop shows up in their latency.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+# The app builds its Bedrock client at startup; generation is stubbed out, so
+# placeholder credentials are enough and no AWS call is ever made.
+os.environ.setdefault("AWS_REGION_NAME", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+os.environ.setdefault("QUIZ_GENERATOR_SQLITE_FILE_NAME", os.path.join(tempfile.gettempdir(), "quiz_async_load.db"))
+
+import httpx
+from fastapi import FastAPI, Form
+from fastapi.responses import RedirectResponse
+from sqlmodel import Session, SQLModel
+
+from app import main as quiz_app
+from app.crud import add_quiz, list_quiz_summaries
+from app.database import engine
+from app.stats import get_stats, invalidate_stats
+from benchmarks.quiz_persistence import make_quiz_data
+
+
+async def fake_generate_quizzes(number_of_questions: int, number_of_options: int, text: str, **kwargs):
+    await asyncio.sleep(float(os.environ.get("BENCHMARK_LLM_LATENCY", "0.2")))
+    return [make_quiz_data(number_of_questions, number_of_options)]
+
+
+def build_sync_app() -> FastAPI:
+    """The list and create routes as they were before AsyncSession."""
+    app = FastAPI()
+
+    @app.get("/api/quizzes/")
+    async def list_quizzes():
+        with Session(engine) as session:
+            quizzes, next_cursor = list_quiz_summaries(session, limit=24)
+            return {"quizzes": quizzes, "total": get_stats(session)["total_quizzes"], "next_cursor": next_cursor}
+
+    @app.post("/quizzes/")
+    async def create_quiz(
+        content: str = Form(...), number_of_questions: int = Form(...), number_of_options: int = Form(...)
+    ):
+        quiz_data = (await fake_generate_quizzes(number_of_questions, number_of_options, content))[0]
+        with Session(engine) as session:
+            quiz = add_quiz(
+                session,
+                topic=None,
+                content=content,
+                number_of_questions=number_of_questions,
+                number_of_options=number_of_options,
+                quiz_data=quiz_data
+            )
+            quiz_id = quiz.id
+            session.commit()
+        invalidate_stats()
+        return RedirectResponse(url=f"/quizzes/{quiz_id}", status_code=303)
+
+    return app
+
+
+def build_async_app() -> FastAPI:
+    quiz_app.generate_quizzes = fake_generate_quizzes
+    return quiz_app.app
+
+
+def reset_database(seed: int) -> None:
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for _ in range(seed):
+            add_quiz(session, None, "seed", 20, 4, make_quiz_data(20, 4))
+        session.commit()
+
+
+def start_server(factory: str, port: int) -> subprocess.Popen:
+    server = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "--factory", f"benchmarks.async_load:{factory}",
+        "--port", str(port), "--log-level", "warning",
+    ])
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"uvicorn did not start on port {port}")
+
+
+async def read_page(client: httpx.AsyncClient, scheduled: float, latencies: list) -> None:
+    response = await client.get("/api/quizzes/")
+    response.raise_for_status()
+    latencies.append(time.perf_counter() - scheduled)
+
+
+async def readers(client: httpx.AsyncClient, stop: asyncio.Event, latencies: list, rate: float) -> None:
+    interval = 1 / rate
+    started = time.perf_counter()
+    sent = 0
+    pending = set()
+    while not stop.is_set():
+        scheduled = started + sent * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(read_page(client, scheduled, latencies))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        sent += 1
+    await asyncio.gather(*pending)
+
+
+async def writer(client: httpx.AsyncClient, stop: asyncio.Event, saved: list, questions: int) -> None:
+    while not stop.is_set():
+        response = await client.post("/quizzes/", data={
+            "mode": "paste", "content": "benchmark " * 500,
+            "number_of_questions": questions, "number_of_options": 4,
+        })
+        assert response.status_code == 303, response.text
+        saved.append(1)
+
+
+async def load(base_url: str, args) -> dict:
+    stop = asyncio.Event()
+    latencies, saved = [], []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        tasks = [asyncio.create_task(readers(client, stop, latencies, args.rate))]
+        tasks += [asyncio.create_task(writer(client, stop, saved, args.questions)) for _ in range(args.writers)]
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+    return {"latencies": latencies, "saved": len(saved)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rate", type=float, default=50, help="page reads started per second")
+    parser.add_argument("--writers", type=int, default=8, help="clients creating quizzes back to back")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per variant")
+    parser.add_argument("--questions", type=int, default=50, help="questions per saved quiz")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="simulated generation time")
+    parser.add_argument("--seed", type=int, default=500, help="quizzes saved before measuring")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    os.environ["BENCHMARK_LLM_LATENCY"] = str(args.llm_latency)
+
+    print(f"{'variant':<8} {'reads/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'quizzes saved':>14}")
+    for name, factory in (("sync", "build_sync_app"), ("async", "build_async_app")):
+        reset_database(args.seed)
+        server = start_server(factory, args.port)
+        try:
+            result = asyncio.run(load(f"http://127.0.0.1:{args.port}", args))
+        finally:
+            server.terminate()
+            server.wait()
+        latencies = sorted(result["latencies"])
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(
+            f"{name:<8} {len(latencies) / args.duration:>8.0f} {statistics.median(latencies) * 1000:>8.1f} "
+            f"{p99 * 1000:>8.1f} {latencies[-1] * 1000:>8.1f} {result['saved']:>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Compare the default SQLite engine with the tuned profile in app/database.py
+under concurrent reads and writes.
+
+Run from the quiz-generator directory:
+
+    uv run python -m benchmarks.database_concurrency --readers 8 --writers 2 --duration 5
+
+Reader threads list a page of quizzes and count questions, like the list and
+home pages; writer threads save 20-question quizzes like create_quiz. Each
+engine gets a fresh database file seeded with the same quizzes.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("QUIZ_GENERATOR_SQLITE_FILE_NAME", os.path.join(tempfile.gettempdir(), "quiz_benchmark.db"))
+
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app import models
+from app.crud import add_quiz, list_quiz_summaries
+from app.database import build_engine
+from benchmarks.quiz_persistence import make_quiz_data
+
+
+def percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def save_quiz(engine) -> None:
+    with Session(engine) as session:
+        add_quiz(
+            session,
+            topic=None,
+            content="benchmark " * 200,
+            number_of_questions=20,
+            number_of_options=4,
+            quiz_data=make_quiz_data(20, 4)
+        )
+        session.commit()
+
+
+def read_page(engine) -> None:
+    with Session(engine) as session:
+        list_quiz_summaries(session, limit=24)
+        session.exec(select(func.count()).select_from(models.Question)).one()
+
+
+def worker(engine, operation, stop: threading.Event, latencies: list, errors: list) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            operation(engine)
+        except OperationalError as e:
+            errors.append(str(e.orig))
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def run(engine, readers: int, writers: int, duration: float, seed: int) -> dict:
+    SQLModel.metadata.create_all(engine)
+    for _ in range(seed):
+        save_quiz(engine)
+
+    stop = threading.Event()
+    reads, writes, errors = [], [], []
+    threads = [
+        threading.Thread(target=worker, args=(engine, read_page, stop, reads, errors)) for _ in range(readers)
+    ] + [
+        threading.Thread(target=worker, args=(engine, save_quiz, stop, writes, errors)) for _ in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    return {"reads": reads, "writes": writes, "errors": errors}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per engine")
+    parser.add_argument("--seed", type=int, default=200, help="quizzes saved before measuring")
+    args = parser.parse_args()
+
+    profiles = (
+        ("default", lambda url: create_engine(url)),
+        ("tuned", build_engine),
+    )
+    print(f"{'engine':<8} {'reads/s':>8} {'read p50':>9} {'read p99':>9} {'writes/s':>9} {'write p99':>10} {'errors':>7}")
+    for name, make_engine in profiles:
+        with tempfile.TemporaryDirectory() as directory:
+            engine = make_engine(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+            result = run(engine, args.readers, args.writers, args.duration, args.seed)
+        reads, writes = result["reads"], result["writes"]
+        print(
+            f"{name:<8} {len(reads) / args.duration:>8.0f} "
+            f"{statistics.median(reads) * 1000 if reads else 0:>7.1f}ms {percentile(reads, 0.99) * 1000:>7.1f}ms "
+            f"{len(writes) / args.duration:>9.0f} {percentile(writes, 0.99) * 1000:>8.1f}ms {len(result['errors']):>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Compare the old per-question commits with the single-transaction save used by
+create_quiz.
+
+Run from the quiz-generator directory:
+
+    uv run python -m benchmarks.quiz_persistence --sizes 10 50 200 --repeat 5
+
+Each run writes to a fresh SQLite file, so commit (fsync) cost is included.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine
+
+from app import models
+from app.crud import add_quiz, is_all_caps
+from app.schemas import QuizSchema
+
+
+def make_quiz_data(number_of_questions: int, number_of_options: int) -> QuizSchema:
+    questions = {}
+    for q in range(number_of_questions):
+        options = [f"wrong option {q}-{o}" for o in range(number_of_options - 1)]
+        options.insert(q % number_of_options, f"CORRECT ANSWER {q}")
+        questions[f"Question number {q}?"] = options
+    return QuizSchema(questions=questions)
+
+
+def save_per_question(session: Session, quiz_data: QuizSchema, number_of_options: int) -> int:
+    """The persistence loop create_quiz used before: a commit per question and per option set."""
+    quiz = models.Quiz(
+        topic=None,
+        content="benchmark",
+        number_of_questions=len(quiz_data.questions),
+        number_of_options=number_of_options
+    )
+    session.add(quiz)
+    session.commit()
+    session.refresh(quiz)
+
+    for question_text, options_list in quiz_data.questions.items():
+        db_question = models.Question(quiz_id=quiz.id, question=question_text)
+        session.add(db_question)
+        session.commit()
+
+        caps_options = [o for o in options_list if is_all_caps(o)]
+        correct_option = caps_options[0] if len(caps_options) == 1 else None
+        for option_text in options_list:
+            session.add(models.Option(
+                question_id=db_question.id,
+                option=option_text.lower(),
+                is_correct=(correct_option is not None and option_text == correct_option)
+            ))
+        session.commit()
+    return quiz.id
+
+
+def save_single_transaction(session: Session, quiz_data: QuizSchema, number_of_options: int) -> int:
+    quiz = add_quiz(
+        session,
+        topic=None,
+        content="benchmark",
+        number_of_questions=len(quiz_data.questions),
+        number_of_options=number_of_options,
+        quiz_data=quiz_data
+    )
+    quiz_id = quiz.id
+    session.commit()
+    return quiz_id
+
+
+def measure(save, quiz_data: QuizSchema, number_of_options: int) -> tuple:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'benchmark.db')}")
+        SQLModel.metadata.create_all(engine)
+        counts = {"commits": 0, "statements": 0}
+
+        @event.listens_for(engine, "commit")
+        def count_commit(conn):
+            counts["commits"] += 1
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            counts["statements"] += 1
+
+        with Session(engine) as session:
+            start = time.perf_counter()
+            save(session, quiz_data, number_of_options)
+            elapsed = time.perf_counter() - start
+        engine.dispose()
+    return elapsed, counts["commits"], counts["statements"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200], help="questions per quiz")
+    parser.add_argument("--options", type=int, default=4, help="options per question")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per size and strategy")
+    args = parser.parse_args()
+
+    print(f"{'questions':>9}  {'strategy':<20} {'commits':>7} {'statements':>10} {'median ms':>10}")
+    for size in args.sizes:
+        quiz_data = make_quiz_data(size, args.options)
+        for name, save in (("per-question", save_per_question), ("single-transaction", save_single_transaction)):
+            runs = [measure(save, quiz_data, args.options) for _ in range(args.repeat)]
+            median_ms = statistics.median(elapsed for elapsed, _, _ in runs) * 1000
+            _, commits, statements = runs[0]
+            print(f"{size:>9}  {name:<20} {commits:>7} {statements:>10} {median_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import base64
+import binascii
+import json
+from typing import List, Optional, Tuple
+
+from decouple import config
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from . import models
+from .schemas import StoryListResponse
+
+
+PAGE_SIZE = config("STORY_GENERATOR_PAGE_SIZE", default=24, cast=int)
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(story_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": story_id}).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Return the story id in a cursor token; raises ValueError if the token is malformed."""
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["id"])
+    except (TypeError, KeyError, UnicodeDecodeError, json.JSONDecodeError, binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def count_stories(session: Session, genre: Optional[models.Genre] = None) -> int:
+    statement = select(func.count()).select_from(models.Story)
+    if genre is not None:
+        statement = statement.where(models.Story.genre == genre)
+    return session.exec(statement).one()
+
+
+def list_story_summaries(
+    session: Session, limit: int, cursor: Optional[str] = None, genre: Optional[models.Genre] = None
+) -> Tuple[List[StoryListResponse], Optional[str]]:
+    """
+    One page of stories, newest first, and the cursor for the next page.
+
+    Only id, idea and genre are read, never the story text. Pages are keyed
+    on the last id seen, and the genre filter walks ix_story_genre.
+    """
+    statement = (
+        select(models.Story.id, models.Story.idea, models.Story.genre)
+        .order_by(models.Story.id.desc())
+        .limit(limit + 1)
+    )
+    if genre is not None:
+        statement = statement.where(models.Story.genre == genre)
+    if cursor is not None:
+        statement = statement.where(models.Story.id < decode_cursor(cursor))
+    rows = session.exec(statement).all()
+
+    stories = [
+        StoryListResponse(id=story_id, idea=idea, genre=story_genre)
+        for story_id, idea, story_genre in rows[:limit]
+    ]
+    next_cursor = encode_cursor(stories[-1].id) if len(rows) > limit else None
+    return stories, next_cursor
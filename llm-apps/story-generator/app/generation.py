@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+from decouple import config
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from . import models
+from .database import async_engine
+from .prompts import OutlineError, stream_long_story_content, stream_story_content
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between writes of the partial story to the database.
+FLUSH_INTERVAL = config("STORY_GENERATOR_FLUSH_INTERVAL", default=2, cast=float)
+
+
+class StoryGeneration:
+    """A streamed generation in flight, which any number of readers can follow."""
+
+    def __init__(self, story_id: int):
+        self.story_id = story_id
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[str] = None
+        self._changed = asyncio.Condition()
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    async def append(self, chunk: str) -> None:
+        async with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+
+    async def finish(self, error: Optional[str] = None) -> None:
+        async with self._changed:
+            self.done = True
+            self.error = error
+            self._changed.notify_all()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """Yield every chunk generated so far, then new ones until the generation ends."""
+        position = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: position < len(self.chunks) or self.done)
+                pending = self.chunks[position:]
+                finished = self.done
+            position += len(pending)
+            for chunk in pending:
+                yield chunk
+            if finished and position == len(self.chunks):
+                return
+
+
+_generations: Dict[int, StoryGeneration] = {}
+_tasks: Dict[int, asyncio.Task] = {}
+
+
+def get_generation(story_id: int) -> Optional[StoryGeneration]:
+    return _generations.get(story_id)
+
+
+async def _save_story_text(story_id: int, text: str) -> None:
+    async with AsyncSession(async_engine) as session:
+        story = await session.get(models.Story, story_id)
+        if story is not None:
+            story.story = text
+            session.add(story)
+            await session.commit()
+
+
+async def _run(generation: StoryGeneration, parameters: dict, long_form: bool = False) -> None:
+    error = None
+    last_flush = time.monotonic()
+    try:
+        stream = stream_long_story_content if long_form else stream_story_content
+        async for chunk in stream(**parameters):
+            await generation.append(chunk)
+            if time.monotonic() - last_flush >= FLUSH_INTERVAL:
+                await _save_story_text(generation.story_id, generation.text)
+                last_flush = time.monotonic()
+    except asyncio.TimeoutError:
+        error = "Story generation timed out"
+    except OutlineError as e:
+        logger.warning("Long-form generation of story %s failed: %s", generation.story_id, e)
+        error = "The model returned an unusable outline for the long-form story; try again"
+    except Exception:
+        logger.exception("Streaming generation of story %s failed", generation.story_id)
+        error = "Story generation failed"
+    finally:
+        try:
+            if generation.chunks:
+                await _save_story_text(generation.story_id, generation.text)
+        except Exception:
+            logger.exception("Saving story %s failed", generation.story_id)
+            error = error or "The story could not be saved"
+        finally:
+            # Followers wait on finish(), so it runs whatever happened above.
+            _generations.pop(generation.story_id, None)
+            _tasks.pop(generation.story_id, None)
+            await generation.finish(error)
+
+
+def start_generation(story: models.Story, long_form: bool = False) -> StoryGeneration:
+    """
+    Start streaming a story in the background, or return the generation
+    already running for it.
+
+    The partial text is written to Story.story every FLUSH_INTERVAL seconds
+    and once more when the generation ends. A long_form story is written
+    chapter by chapter and arrives one chapter at a time.
+    """
+    generation = _generations.get(story.id)
+    if generation is None:
+        generation = StoryGeneration(story.id)
+        _generations[story.id] = generation
+        parameters = dict(
+            idea=story.idea,
+            genre=story.genre,
+            unique_insight=story.unique_insight,
+            structure=story.structure,
+            number_of_characters=story.number_of_characters,
+            point_of_view=story.point_of_view,
+        )
+        _tasks[story.id] = asyncio.create_task(_run(generation, parameters, long_form))
+    return generation
@@ -1,17 +1,23 @@
-from typing import Annotated
-
-from fastapi import FastAPI, Depends, status, HTTPException, Form, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
-from sqlmodel import Session, select
+import asyncio
+import json
+from typing import Annotated, Optional
+
+from fastapi import FastAPI, Depends, status, HTTPException, Form, Query, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette.templating import Jinja2Templates
 
 
 from . import models
-from .database import create_db_and_tables, get_session
-from .prompts import generate_story_content
-from .schemas import StoryDetailResponse, StoryListResponse
+from .clients import get_bedrock_client
+from .crud import MAX_PAGE_SIZE, PAGE_SIZE, count_stories, list_story_summaries
+from .database import create_db_and_tables, get_async_session
+from .generation import get_generation, start_generation
+from .prompts import OutlineError, generate_long_story_content, generate_story_content
+from .schemas import StoryDetailResponse, StoryListPageResponse
 
-SessionDep = Annotated[Session, Depends(get_session)] 
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
 
 
 app = FastAPI()
@@ -22,6 +28,7 @@ templates = Jinja2Templates(directory="app/templates")
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables()
+    get_bedrock_client()
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -47,22 +54,47 @@ async def create_story_form(request: Request):
 @app.post("/create")
 async def create_story(
     request: Request,
-    session: SessionDep,
+    session: AsyncSessionDep,
     idea: str = Form(...),
     genre: str = Form(...),
     unique_insight: str = Form(...),
     structure: str = Form(...),
     number_of_characters: int = Form(...),
     point_of_view: str = Form(...),
+    stream: bool = Form(default=False),
+    long_form: bool = Form(default=False),
 ):
-    generated_story = await generate_story_content(
-        idea=idea,
-        genre=models.Genre(genre),
-        unique_insight=unique_insight,
-        structure=models.Structure(structure),
-        number_of_characters=number_of_characters,
-        point_of_view=models.PointOfView(point_of_view)
-    )
+    if stream:
+        # Save the parameters now and stream the text in; the detail page follows along.
+        story = models.Story(
+            idea=idea,
+            genre=models.Genre(genre),
+            unique_insight=unique_insight,
+            structure=models.Structure(structure),
+            number_of_characters=number_of_characters,
+            point_of_view=models.PointOfView(point_of_view),
+            story=""
+        )
+        session.add(story)
+        await session.commit()
+        await session.refresh(story)
+        start_generation(story, long_form=long_form)
+        return RedirectResponse(url=f"/stories/{story.id}", status_code=status.HTTP_303_SEE_OTHER)
+
+    generate = generate_long_story_content if long_form else generate_story_content
+    try:
+        generated_story = await generate(
+            idea=idea,
+            genre=models.Genre(genre),
+            unique_insight=unique_insight,
+            structure=models.Structure(structure),
+            number_of_characters=number_of_characters,
+            point_of_view=models.PointOfView(point_of_view)
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Story generation timed out")
+    except OutlineError:
+        raise HTTPException(status_code=502, detail="The model returned an unusable outline for the long-form story; try again")
     
     story = models.Story(
         idea=idea,
@@ -74,21 +106,51 @@ async def create_story(
         story=generated_story.story
     )
     session.add(story)
-    session.commit()
-    session.refresh(story)
+    await session.commit()
+    await session.refresh(story)
     return RedirectResponse(url=f"/stories/{story.id}", status_code=status.HTTP_303_SEE_OTHER)
 
 
 @app.get("/stories", response_class=HTMLResponse)
-async def list_stories(request: Request, session: SessionDep):
-    stories = session.exec(select(models.Story)).all()
-    stories_response = [StoryListResponse(id=story.id, idea=story.idea, genre=story.genre) for story in stories]
-    return templates.TemplateResponse(request, "list.html", {"stories": stories_response})
+async def list_stories(
+    request: Request, session: AsyncSessionDep, cursor: Optional[str] = None, genre: Optional[models.Genre] = None
+):
+    story_page = await _list_stories(session, cursor, PAGE_SIZE, genre)
+    return templates.TemplateResponse(request, "list.html", {
+        "stories": story_page.stories,
+        "total": story_page.total,
+        "next_cursor": story_page.next_cursor,
+        "is_first_page": cursor is None,
+        "genre": genre,
+        "genre_choices": list(models.Genre),
+    })
+
+
+@app.get("/api/stories/", response_model=StoryListPageResponse)
+async def list_stories_api(
+    session: AsyncSessionDep,
+    cursor: Optional[str] = None,
+    genre: Optional[models.Genre] = None,
+    limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+):
+    """Story summaries, newest first. Pass next_cursor back as cursor for the next page."""
+    return await _list_stories(session, cursor, limit, genre)
+
+
+async def _list_stories(
+    session: AsyncSession, cursor: Optional[str], limit: int, genre: Optional[models.Genre]
+) -> StoryListPageResponse:
+    try:
+        stories, next_cursor = await session.run_sync(list_story_summaries, limit=limit, cursor=cursor, genre=genre)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    total = await session.run_sync(count_stories, genre)
+    return StoryListPageResponse(stories=stories, total=total, next_cursor=next_cursor)
 
 
 @app.get("/stories/{story_id}", response_class=HTMLResponse)
-async def detail_story(request: Request, session: SessionDep, story_id: int):
-    story = session.get(models.Story, story_id)
+async def detail_story(request: Request, session: AsyncSessionDep, story_id: int):
+    story = await session.get(models.Story, story_id)
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
     
@@ -103,29 +165,71 @@ async def detail_story(request: Request, session: SessionDep, story_id: int):
         story=story.story
     )
 
-    return templates.TemplateResponse(request, "detail.html", {"story": story_response})
+    return templates.TemplateResponse(request, "detail.html", {
+        "story": story_response,
+        "generating": get_generation(story_id) is not None,
+    })
+
+
+@app.get("/stories/{story_id}/stream")
+async def stream_story(session: AsyncSessionDep, story_id: int):
+    """
+    Server-Sent Events for a story: "chunk" events carrying JSON-encoded text,
+    then "done" (or "error"). A story that is not being generated is sent as
+    a single chunk.
+    """
+    generation = get_generation(story_id)
+    if generation is None:
+        story = await session.get(models.Story, story_id)
+        if not story:
+            raise HTTPException(status_code=404, detail="Story not found")
+        stored_text = story.story
+
+    async def events():
+        if generation is None:
+            yield f"event: chunk\ndata: {json.dumps(stored_text)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+            return
+        async for chunk in generation.follow():
+            yield f"event: chunk\ndata: {json.dumps(chunk)}\n\n"
+        if generation.error:
+            yield f"event: error\ndata: {json.dumps(generation.error)}\n\n"
+        else:
+            yield "event: done\ndata: {}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
 
 
 @app.post("/stories/{story_id}/generate", response_class=HTMLResponse)
-async def generate_story(request: Request, session: SessionDep, story_id: int):
-    story = session.get(models.Story, story_id)
+async def generate_story(request: Request, session: AsyncSessionDep, story_id: int, stream: bool = Form(default=False), long_form: bool = Form(default=False)):
+    story = await session.get(models.Story, story_id)
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
 
-    generated_story = await generate_story_content(
-        idea=story.idea,
-        genre=story.genre,
-        unique_insight=story.unique_insight,
-        structure=story.structure,
-        number_of_characters=story.number_of_characters,
-        point_of_view=story.point_of_view
-    )
+    if stream:
+        start_generation(story, long_form=long_form)
+        return RedirectResponse(url=f"/stories/{story.id}", status_code=status.HTTP_303_SEE_OTHER)
+
+    generate = generate_long_story_content if long_form else generate_story_content
+    try:
+        generated_story = await generate(
+            idea=story.idea,
+            genre=story.genre,
+            unique_insight=story.unique_insight,
+            structure=story.structure,
+            number_of_characters=story.number_of_characters,
+            point_of_view=story.point_of_view
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Story generation timed out")
+    except OutlineError:
+        raise HTTPException(status_code=502, detail="The model returned an unusable outline for the long-form story; try again")
 
     if generated_story:
         story.story = generated_story.story
         session.add(story)
-        session.commit()
-        session.refresh(story)
+        await session.commit()
+        await session.refresh(story)
 
     story_response = StoryDetailResponse(
         id=story.id,
@@ -39,7 +39,7 @@ class PointOfView(str, Enum):
 class Story(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
     idea: str = Field(max_length=1000)
-    genre: Genre  # Use the Genre Enum
+    genre: Genre = Field(index=True)  # Use the Genre Enum
     unique_insight: str = Field(max_length=1000)
     structure: Structure  # Use the Structure Enum
     number_of_characters: int
@@ -1,7 +1,20 @@
-import boto3
+import asyncio
+import json
+from typing import AsyncIterator
+
 from decouple import config
+from pydantic import ValidationError
+
+from .clients import BEDROCK_TIMEOUT, converse, converse_stream
+from .schemas import StoryOutlineSchema, StorySchema
+
+
+LONG_FORM_CHAPTERS = config("STORY_GENERATOR_LONG_FORM_CHAPTERS", default=6, cast=int)
+LONG_FORM_CONCURRENCY = config("STORY_GENERATOR_LONG_FORM_CONCURRENCY", default=4, cast=int)
 
-from .schemas import StorySchema
+
+class OutlineError(ValueError):
+    """The model's outline for a long-form story could not be used."""
 
 
 PROMPT_TEMPLATE = """You are a master storyteller. Generate a rich, comprehensive, and immersive story based on the parameters below.
@@ -27,16 +40,62 @@ Requirements:
 Return only the story text. No preamble, no commentary.
 """
 
+OUTLINE_TEMPLATE = """You are a master storyteller planning a long-form story. Outline the story described by the parameters below in exactly {number_of_chapters} chapters.
 
-async def generate_story_content(idea: str, genre: str, unique_insight: str, structure: str, number_of_characters: int, point_of_view: str):
-    client = boto3.client(
-        "bedrock-runtime",
-        region_name=config("AWS_REGION_NAME"),
-        aws_access_key_id=config("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=config("AWS_SECRET_ACCESS_KEY"),
-    )
+Parameters:
+- Idea: {idea}
+- Genre: {genre}
+- Unique Insight: {unique_insight}
+- Structure: {structure}
+- Number of Characters: {number_of_characters}
+- Point of View: {point_of_view}
+
+Requirements:
+- Apply the specified narrative structure across the chapters
+- Name the characters and give each a clear arc over the outline
+- Build tension towards a climax and resolve the story in the final chapter
+- Each summary must say what happens in that chapter, so it can be written without seeing the others
+
+Return your response as a valid JSON object in this exact format:
+{{
+  "chapters": [
+    {{"title": "The Beginning", "summary": "What happens in this chapter..."}},
+    {{"title": "The Turn", "summary": "What happens in this chapter..."}}
+  ]
+}}
+
+Return ONLY the JSON object. No explanation, no markdown, no code blocks.
+"""
+
+CHAPTER_TEMPLATE = """You are a master storyteller writing one chapter of a long-form story.
+
+Parameters:
+- Idea: {idea}
+- Genre: {genre}
+- Unique Insight: {unique_insight}
+- Structure: {structure}
+- Number of Characters: {number_of_characters}
+- Point of View: {point_of_view}
+
+Full outline:
+{outline}
+
+Write chapter {chapter_number} of {number_of_chapters}: "{title}".
 
-    response = client.converse(
+Requirements:
+- Start with the line "Chapter {chapter_number}: {title}" followed by a blank line
+- Write at least 800 words covering exactly what the outline gives for this chapter
+- Separate paragraphs with a blank line
+- Stay consistent with the characters, point of view and events of the outline
+- Use vivid, sensory language to bring scenes to life
+- Do not write any other chapter
+
+Return only the chapter text. No preamble, no commentary.
+"""
+
+
+def _story_request(idea: str, genre: str, unique_insight: str, structure: str, number_of_characters: int, point_of_view: str) -> dict:
+    return dict(
         modelId="us.amazon.nova-lite-v1:0",
         messages=[
             {
@@ -61,5 +120,135 @@ async def generate_story_content(idea: str, genre: str, unique_insight: str, str
         }
     )
 
+
+async def generate_story_content(idea: str, genre: str, unique_insight: str, structure: str, number_of_characters: int, point_of_view: str, timeout: float = BEDROCK_TIMEOUT):
+    response = await converse(
+        timeout=timeout,
+        **_story_request(idea, genre, unique_insight, structure, number_of_characters, point_of_view)
+    )
+
     story_text = response["output"]["message"]["content"][0]["text"]
     return StorySchema(story=story_text)
+
+
+def stream_story_content(idea: str, genre: str, unique_insight: str, structure: str, number_of_characters: int, point_of_view: str, timeout: float = BEDROCK_TIMEOUT) -> AsyncIterator[str]:
+    """Same prompt as generate_story_content, yielding the story text as it is generated."""
+    return converse_stream(
+        timeout=timeout,
+        **_story_request(idea, genre, unique_insight, structure, number_of_characters, point_of_view)
+    )
+
+
+def _strip_code_fences(raw_text: str) -> str:
+    raw_text = raw_text.strip()
+    if raw_text.startswith("```"):
+        raw_text = raw_text.split("```")[1]
+        if raw_text.startswith("json"):
+            raw_text = raw_text[4:]
+        raw_text = raw_text.strip()
+    return raw_text
+
+
+async def generate_story_outline(idea: str, genre: str, unique_insight: str, structure: str, number_of_characters: int, point_of_view: str, number_of_chapters: int = LONG_FORM_CHAPTERS, timeout: float = BEDROCK_TIMEOUT) -> StoryOutlineSchema:
+    response = await converse(
+        timeout=timeout,
+        modelId="us.amazon.nova-lite-v1:0",
+        messages=[{
+            "role": "user",
+            "content": [{
+                "text": OUTLINE_TEMPLATE.format(
+                    idea=idea,
+                    genre=genre,
+                    unique_insight=unique_insight,
+                    structure=structure,
+                    number_of_characters=number_of_characters,
+                    point_of_view=point_of_view,
+                    number_of_chapters=number_of_chapters
+                )
+            }]
+        }],
+        inferenceConfig={"maxTokens": 2048, "temperature": 0.7}
+    )
+    raw_text = response["output"]["message"]["content"][0]["text"]
+    try:
+        outline = StoryOutlineSchema.model_validate(json.loads(_strip_code_fences(raw_text)))
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise OutlineError(f"The story outline was not valid JSON in the expected format: {e}") from e
+    if not outline.chapters:
+        raise OutlineError("The story outline has no chapters")
+    return outline
+
+
+async def stream_long_story_content(idea: str, genre: str, unique_insight: str, structure: str, number_of_characters: int, point_of_view: str, number_of_chapters: int = LONG_FORM_CHAPTERS, concurrency: int = LONG_FORM_CONCURRENCY, timeout: float = BEDROCK_TIMEOUT) -> AsyncIterator[str]:
+    """
+    Generate a story chapter by chapter: an outline first, then every chapter
+    concurrently (at most concurrency at a time).
+
+    Chapters are yielded in story order as soon as each one and all before
+    it are done. Each chapter has its own token budget, so the length of the
+    story is no longer capped by a single response.
+    """
+    parameters = dict(
+        idea=idea,
+        genre=genre,
+        unique_insight=unique_insight,
+        structure=structure,
+        number_of_characters=number_of_characters,
+        point_of_view=point_of_view,
+    )
+    outline = await generate_story_outline(number_of_chapters=number_of_chapters, timeout=timeout, **parameters)
+    chapters = outline.chapters
+    outline_text = "\n".join(
+        f"{number}. {chapter.title}: {chapter.summary}" for number, chapter in enumerate(chapters, start=1)
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def write_chapter(number: int, title: str) -> str:
+        async with semaphore:
+            response = await converse(
+                timeout=timeout,
+                modelId="us.amazon.nova-lite-v1:0",
+                messages=[{
+                    "role": "user",
+                    "content": [{
+                        "text": CHAPTER_TEMPLATE.format(
+                            outline=outline_text,
+                            chapter_number=number,
+                            number_of_chapters=len(chapters),
+                            title=title,
+                            **parameters
+                        )
+                    }]
+                }],
+                inferenceConfig={"maxTokens": 4096, "temperature": 0.8}
+            )
+        return response["output"]["message"]["content"][0]["text"].strip()
+
+    tasks = [
+        asyncio.create_task(write_chapter(number, chapter.title))
+        for number, chapter in enumerate(chapters, start=1)
+    ]
+    try:
+        for number, task in enumerate(tasks, start=1):
+            chapter_text = await task
+            yield chapter_text if number == len(tasks) else chapter_text + "\n\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def generate_long_story_content(idea: str, genre: str, unique_insight: str, structure: str, number_of_characters: int, point_of_view: str, number_of_chapters: int = LONG_FORM_CHAPTERS, concurrency: int = LONG_FORM_CONCURRENCY, timeout: float = BEDROCK_TIMEOUT) -> StorySchema:
+    chapters = [
+        chapter async for chapter in stream_long_story_content(
+            idea=idea,
+            genre=genre,
+            unique_insight=unique_insight,
+            structure=structure,
+            number_of_characters=number_of_characters,
+            point_of_view=point_of_view,
+            number_of_chapters=number_of_chapters,
+            concurrency=concurrency,
+            timeout=timeout,
+        )
+    ]
+    return StorySchema(story="".join(chapters))
@@ -8,11 +8,27 @@ from pydantic import BaseModel, Field
 class StorySchema(BaseModel):
     story: str = Field(description='a story')
 
+class ChapterOutline(BaseModel):
+    title: str = Field(description='chapter title')
+    summary: str = Field(description='what happens in the chapter')
+
+
+class StoryOutlineSchema(BaseModel):
+    chapters: List[ChapterOutline] = Field(description='the chapters of the story, in order')
+
+
 class StoryListResponse(BaseModel):
     id: int
     idea: str
     genre: str
-    
+
+
+class StoryListPageResponse(BaseModel):
+    stories: List[StoryListResponse]
+    total: int
+    next_cursor: Optional[str] = None
+
+
 class StoryDetailResponse(BaseModel):
     id: int
     idea: str
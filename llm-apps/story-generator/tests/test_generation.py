@@ -0,0 +1,38 @@
+import asyncio
+import os
+import tempfile
+
+os.environ.setdefault("STORY_GENERATOR_SQLITE_FILE_NAME", os.path.join(tempfile.gettempdir(), "story_generator_test.db"))
+
+from app import generation
+
+
+async def stream_two_chunks(**parameters):
+    yield "Once upon a time"
+    yield ", the end."
+
+
+async def failing_save(story_id: int, text: str) -> None:
+    raise RuntimeError("database is locked")
+
+
+def test_followers_get_the_end_event_when_the_final_save_fails(monkeypatch):
+    monkeypatch.setattr(generation, "stream_story_content", stream_two_chunks)
+    monkeypatch.setattr(generation, "_save_story_text", failing_save)
+
+    async def run():
+        story_generation = generation.StoryGeneration(story_id=1)
+        generation._generations[1] = story_generation
+        follower = asyncio.create_task(asyncio.wait_for(_collect(story_generation), timeout=5))
+        await generation._run(story_generation, {})
+        return story_generation, await follower
+
+    story_generation, chunks = asyncio.run(run())
+    assert chunks == ["Once upon a time", ", the end."]
+    assert story_generation.done
+    assert story_generation.error == "The story could not be saved"
+    assert generation.get_generation(1) is None
+
+
+async def _collect(story_generation):
+    return [chunk async for chunk in story_generation.follow()]